@@ -1,4 +1,8 @@
 import math
+from functools import lru_cache
+
+import numpy as np
+from scipy.special import betaln
 
 
 def binomial_coefficient(n, k=2):
@@ -6,6 +10,9 @@ def binomial_coefficient(n, k=2):
     Calculates the number of sets with k elements 
     that can be chosen from a set with n elements
 
+    Exact integer evaluation (multiplicative formula with the k <-> n-k symmetry, math.comb),
+    correct beyond 2^53 unlike the float division of factorials.
+
     Parameters
     ----------
     n : Int
@@ -20,7 +27,102 @@ def binomial_coefficient(n, k=2):
         Num of ways to choose an unordered subset of k elements 
         from a fixed set of n elements
     """
-    tp = math.factorial(n)
-    bt = math.factorial(k) * math.factorial(n - k)
-    bcoef = int(tp / bt)
-    return bcoef
\ No newline at end of file
+    bcoef = math.comb(n, k)
+    return bcoef
+
+
+def log_binomial_coefficient(n, k=2):
+    """
+    Natural logarithm of the binomial coefficient via the log-beta function,
+    for huge n (the coefficient itself would overflow a float), accepts arrays
+
+    C(n, k) = 1 / ((n + 1) B(n - k + 1, k + 1)); unlike the difference of three log-gammas,
+    which cancels catastrophically for large n (at n = 1e15, k = 2 it loses every decimal),
+    betaln keeps the full relative precision.
+
+    Parameters
+    ----------
+    n : Int or array_like
+        length of fixed set of n elements
+    k: Int or array_like
+        length of subset
+
+    Returns
+    -------
+    log_bcoef: Float or np.ndarray
+        log(n! / (k! (n - k)!))
+    """
+    n, k = np.asarray(n, dtype=float), np.asarray(k, dtype=float)
+    return -np.log1p(n) - betaln(n - k + 1, k + 1)
+
+
+def binomial_coefficients(n, k=2):
+    """
+    Vectorized exact binomial coefficients for arrays of n and k
+
+    The multiplicative formula runs over the whole array in int64, 
+    min(k, n-k) steps at most; if a coefficient may not fit int64 
+    the result is an object array of exact Python ints.
+
+    Parameters
+    ----------
+    n : array_like
+        lengths of fixed sets
+    k: Int or array_like
+        lengths of subsets
+
+    Returns
+    -------
+    bcoefs: np.ndarray
+        C(n, k) elementwise (0 where k < 0 or k > n)
+    """
+    n, k = np.broadcast_arrays(np.asarray(n, dtype=np.int64), np.asarray(k, dtype=np.int64))
+    valid = (0 <= k) & (k <= n)
+    k = np.where(valid, np.minimum(k, n - k), 0)
+
+    if not n.size:
+        return np.zeros(n.shape, dtype=np.int64)
+
+    # intermediate products are bounded by C(n, k) * n
+    if np.max(log_binomial_coefficient(n, k) + np.log(np.maximum(n, 1))) > 62 * math.log(2):
+        comb = np.frompyfunc(math.comb, 2, 1)
+        return np.where(valid, comb(np.where(valid, n, 0), k), 0)
+
+    bcoefs = np.ones(n.shape, dtype=np.int64)
+    for i in range(1, int(k.max()) + 1):
+        step = i <= k
+        bcoefs[step] = bcoefs[step] * (n[step] - k[step] + i) // i
+
+    return np.where(valid, bcoefs, 0)
+
+
+@lru_cache(maxsize=64)
+def pascal_row(n):
+    """
+    All binomial coefficients C(n, 0..n), cached for repeated calls
+
+    Returns
+    -------
+    row: Tuple[Int]
+    """
+    row = [1]
+    for i in range(1, n + 1):
+        row.append(row[-1] * (n - i + 1) // i)
+
+    return tuple(row)
+
+
+@lru_cache(maxsize=8)
+def log_factorial_table(n_max):
+    """
+    log(i!) for i = 0..n_max, cached; log C(n, k) = t[n] - t[k] - t[n - k] is then 3 lookups
+
+    Returns
+    -------
+    table: np.ndarray
+    """
+    table = np.zeros(n_max + 1)
+    np.cumsum(np.log(np.arange(1, n_max + 1)), out=table[1:])
+    table.flags.writeable = False
+
+    return table
@@ -1,26 +1,19 @@
-import math
+import importlib.util
+import os
 
+# Single implementation in the repository root (../binomial_coefficient.py),
+# loaded under another name since this module shadows it when run from phylogenetics/
+_spec = importlib.util.spec_from_file_location(
+    '_binomial_coefficient',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'binomial_coefficient.py'))
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
 
-def binomial_coefficient(n, k=2):
-    """
-    Calculates the number of sets with k elements 
-    that can be chosen from a set with n elements
+binomial_coefficient = _module.binomial_coefficient
+log_binomial_coefficient = _module.log_binomial_coefficient
+binomial_coefficients = _module.binomial_coefficients
+pascal_row = _module.pascal_row
+log_factorial_table = _module.log_factorial_table
 
-    Parameters
-    ----------
-    n : Int
-        length of fixed set of n elements
-    k: Int
-        length of subset
-        (default: k=2) same as  n(n-1)/2
-
-    Returns
-    -------
-    bcoef: Int
-        Num of ways to choose an unordered subset of k elements 
-        from a fixed set of n elements
-    """
-    tp = math.factorial(n)
-    bt = math.factorial(k) * math.factorial(n - k)
-    bcoef = int(tp / bt)
-    return bcoef
\ No newline at end of file
+__all__ = ['binomial_coefficient', 'log_binomial_coefficient', 'binomial_coefficients',
+           'pascal_row', 'log_factorial_table']
@@ -1,11 +1,197 @@
-from binomial_coefficient import *
-import matplotlib.pyplot as plt
-plt.style.use('ggplot')
+import numpy as np
+
+from binomial_coefficient import binomial_coefficients
+
+
+def classical_skyline(N, T):
+    """
+    Calculates the average population sizes of coalescent intervals T
+    using a priori knowledge of the number of genealogical lineages in the interval provided in N.
+    Using the logic of the classical skyline method, for one or many genealogies at once.
+
+    Parameters
+    ----------
+    N : array_like
+        Num of branches from tree topology (the number of genealogical lineages in the interval t ∈ T),
+        (n_intervals,) or (n_trees, n_intervals)
+    T : array_like
+        Coalescence times (interval size), same shape as N
+
+    Returns
+    -------
+    skyline : np.ndarray
+        (..., n_intervals, 2) array, [..., 0] - time before present at the end of each interval,
+        [..., 1] - population size of the interval
+
+    References
+    -----
+    Ho, S. Y., & Shapiro, B. (2011). Skyline-plot methods for
+    estimating demographic history from nucleotide sequences. Molecular ecology resources,
+    11(3), 423–434. https://doi.org/10.1111/j.1755-0998.2011.02988.x
+    """
+    N, T = np.asarray(N), np.asarray(T, dtype=float)
+    psize = binomial_coefficients(N, 2) / 2 * T
+
+    return np.stack([np.cumsum(T, axis=-1), psize], axis=-1)
+
+
+def _generalized_skyline(c, T):
+    # generalized skyline of one genealogy: c = C(n, 2) of each interval
+    n = len(T)
+    ends = np.cumsum(T)
+    S = np.concatenate([[0], np.cumsum(c * T)])
+    log_c = np.sum(np.log(c))
+
+    best = (np.inf, 0.0, None)
+    for epsilon in np.concatenate([[0], np.unique(T)]):
+        # greedy grouping from the present: each group at least epsilon long
+        bounds, start = [0], 0
+        while start < n:
+            stop = max(int(np.searchsorted(ends, (ends[start - 1] if start else 0) + epsilon)) + 1, start + 1)
+            start = min(stop, n)
+            bounds.append(start)
+        # a last group shorter than epsilon is merged into the previous one
+        if len(bounds) > 2 and ends[-1] - (ends[bounds[-2] - 1] if bounds[-2] else 0) < epsilon:
+            del bounds[-2]
+
+        bounds = np.array(bounds)
+        k = np.diff(bounds)
+        theta = (S[bounds[1:]] - S[bounds[:-1]]) / k
+        K = len(k)
+        if n - K - 1 <= 0:
+            continue
+        log_likelihood = log_c - np.sum(k * (np.log(theta) + 1))
+        aicc = -2 * log_likelihood + 2 * K + 2 * K * (K + 1) / (n - K - 1)
+        if aicc < best[0]:
+            best = (aicc, epsilon, np.repeat(theta, k))
+
+    if best[2] is None:
+        return c * T, 0.0
+
+    return best[2], best[1]
+
+
+def generalized_skyline(N, T):
+    """
+    Generalized skyline: adjacent coalescent intervals shorter than epsilon are grouped
+    and share one population size, epsilon is chosen by AICc.
+    Every candidate epsilon (the interval sizes) groups the intervals in one greedy pass
+    with prefix sums, O(n^2) per genealogy.
+
+    Parameters
+    ----------
+    N : array_like
+        Num of lineages in each interval, (n_intervals,) or (n_trees, n_intervals)
+    T : array_like
+        Coalescence times (interval size), same shape as N
+
+    Returns
+    -------
+    skyline : np.ndarray
+        (..., n_intervals, 2) array of interval end times and population sizes (see classical_skyline)
+    epsilon : np.ndarray
+        Chosen epsilon of each genealogy, 0 is the classical skyline
+
+    References
+    -----
+    Strimmer, K., & Pybus, O. G. (2001). Exploring the demographic history of DNA sequences
+    using the generalized skyline plot. Molecular biology and evolution, 18(12), 2298–2305.
+    """
+    skyline = classical_skyline(N, T)
+    c = binomial_coefficients(np.asarray(N), 2).astype(float)
+    T = np.broadcast_to(np.asarray(T, dtype=float), c.shape)
+
+    flat_c, flat_T = c.reshape(-1, c.shape[-1]), T.reshape(-1, c.shape[-1])
+    epsilon = np.zeros(len(flat_c))
+    sizes = np.empty(flat_c.shape)
+    for i in range(len(flat_c)):
+        theta, epsilon[i] = _generalized_skyline(flat_c[i], flat_T[i])
+        sizes[i] = theta / 2
+
+    skyline[..., 1] = sizes.reshape(c.shape)
+
+    return skyline, epsilon.reshape(c.shape[:-1])
+
+
+def skyline_envelope(skylines, times=None, level=0.95, n_times=200):
+    """
+    Median and highest posterior density (HPD) envelope of many skylines
+    (e.g. of posterior genealogies) on a common time grid.
+
+    Each step function is evaluated on the grid by one searchsorted over all skylines
+    (rows shifted apart so the flattened times stay sorted), the HPD interval is
+    the shortest window of sorted sizes that holds the level mass.
+    Beyond the root of a genealogy its last population size is used.
+
+    Parameters
+    ----------
+    skylines : np.ndarray
+        (n_trees, n_intervals, 2) skylines (classical_skyline, generalized_skyline)
+    times : np.ndarray, optional
+        Time grid, n_times points up to the largest root time by default
+    level : Float, default=0.95
+        Mass of the HPD interval
+    n_times : Int, default=200
+
+    Returns
+    -------
+    envelope : Dict
+        time, median, lower, upper - arrays over the time grid
+    """
+    ends, sizes = skylines[..., 0], skylines[..., 1]
+    m, n = ends.shape
+    times = np.linspace(0, ends[:, -1].max(), n_times) if times is None else np.asarray(times, dtype=float)
+
+    span = max(ends.max(), times.max()) + 1
+    offsets = np.arange(m)[:, None] * span
+    index = np.searchsorted((ends + offsets).ravel(), (times[None, :] + offsets).ravel())
+    index = np.minimum(index.reshape(m, -1) - np.arange(m)[:, None] * n, n - 1)
+    values = np.sort(np.take_along_axis(sizes, index, axis=1), axis=0)
+
+    k = max(int(np.ceil(level * m)), 1)
+    widths = values[k - 1:] - values[:m - k + 1]
+    lower = np.argmin(widths, axis=0)
+    columns = np.arange(len(times))
+
+    return {'time': times, 'median': np.median(values, axis=0),
+            'lower': values[lower, columns], 'upper': values[lower + k - 1, columns]}
+
+
+def plot_skyline(skyline=None, envelope=None, ax=None):
+    """
+    Plots a skyline (step function) and/or a posterior envelope
+
+    Parameters
+    ----------
+    skyline : np.ndarray, optional
+        (n_intervals, 2) skyline
+    envelope : Dict, optional
+        Result of skyline_envelope
+    ax : matplotlib.axes.Axes, optional
+
+    Returns
+    -------
+    ax : matplotlib.axes.Axes
+    """
+    import matplotlib.pyplot as plt
+    plt.style.use('ggplot')
+
+    ax = ax or plt.gca()
+    if envelope is not None:
+        ax.fill_between(envelope['time'], envelope['lower'], envelope['upper'], alpha=0.3, step='pre')
+        ax.step(envelope['time'], envelope['median'])
+    if skyline is not None:
+        ax.step(np.r_[0, skyline[:, 0]], np.r_[skyline[0, 1], skyline[:, 1]])
+    ax.set_ylabel('Population size')
+    ax.set_xlabel('Time before present')
+    ax.set_title('Demographic history')
+
+    return ax
 
 
 def plot_population_size(N, T):
     """
-    Calculates the average population sizes (psizes) of coalescent intervals T 
+    Calculates the average population sizes (psizes) of coalescent intervals T
     using a priori knowledge of the number of genealogical lineages in the interval provided in N.
     Using the logic of the classical skyline method.
 
@@ -14,25 +200,15 @@ def plot_population_size(N, T):
     Parameters
     ----------
     N : List[Int]
-        Num of branches from tree topology 
+        Num of branches from tree topology
         (the number of genealogical lineages in the interval t ∈ T)
     T : List[Int]
         Coalescence times (interval size)
-
-    References
-    -----
-    Ho, S. Y., & Shapiro, B. (2011). Skyline-plot methods for 
-    estimating demographic history from nucleotide sequences. Molecular ecology resources, 
-    11(3), 423–434. https://doi.org/10.1111/j.1755-0998.2011.02988.x
     """
-    psize = []
-    for n, t in zip(N, T):
-        psize.append(binomial_coefficient(n) / 2 * t)
-    I = 0
-    plt.step([0] + [I :=I + t for t in T], [psize[0]] + psize)
-    plt.ylabel('Population size')
-    plt.xlabel('Time before present')
-    plt.title('Demographic history')
+    import matplotlib.pyplot as plt
+
+    skyline = classical_skyline(N, T)
+    plot_skyline(skyline)
     plt.show()
 
-    print(f"Population sizes: {psize}")
\ No newline at end of file
+    print(f"Population sizes: {skyline[:, 1].tolist()}")
@@ -1,9 +1,226 @@
-from collections import Counter
+import numpy as np
+
+
+def haplotype_matrix(allseqs):
+    """
+    Converts aligned sequences to a (n_haplotypes, n_sites) uint8 matrix
+
+    Parameters
+    ----------
+    allseqs : List[Str]
+        Aligned sequences of equal length
+
+    Returns
+    -------
+    H : np.ndarray
+    """
+    return np.array([np.frombuffer(seq.encode(), dtype=np.uint8) for seq in allseqs])
+
+
+def ehh_decay(H, core, direction=1, cutoff=None, max_sites=None, n_alleles=2, rows=None):
+    """
+    EHH of the haplotypes H extended from the core site one site at a time.
+
+    The haplotypes are kept sorted so that the ones identical over the sites
+    seen so far are contiguous blocks (positional Burrows-Wheeler order):
+    every new site splits the blocks by allele with one stable sort of nearly sorted keys
+    and the sum of v(v - 1) over block sizes v is updated in O(n).
+    Haplotypes left alone in a block never contribute again and are dropped.
+    Only the visited sites of H are read, so H may be a large np.memmap.
+
+    Parameters
+    ----------
+    H : np.ndarray
+        (n_haplotypes, n_sites) uint8 matrix of alleles
+    core : Int
+        Index of the core site
+    direction : Int, default=1
+        1 - extends towards larger indices, -1 - towards smaller indices
+    cutoff : Float, optional
+        Stops at the first EHH below cutoff (that value included).
+        Without cutoff the decay runs to the end of H, zero after the last shared haplotype
+    max_sites : Int, optional
+        Maximum number of sites (core included)
+    n_alleles : Int, default=2
+        Alleles are 0..n_alleles - 1 (2 for 0/1 data, 256 for any uint8)
+    rows : np.ndarray, optional
+        Indices of the haplotypes of H to use (e.g. the carriers of an allele), all by default
+
+    Returns
+    -------
+    EHHs : np.ndarray
+        EHHs[i] - EHH of the region between the core and the site core + direction * i
+    """
+    active = np.arange(H.shape[0]) if rows is None else np.asarray(rows)
+    n = len(active)
+    sites = np.arange(core, H.shape[1]) if direction > 0 else np.arange(core, -1, -1)
+    if max_sites is not None:
+        sites = sites[:max_sites]
+    if n < 2:
+        return np.zeros(len(sites))
+
+    norm = n * (n - 1)
+    EHHs = np.zeros(len(sites))
+
+    blocks = np.zeros(n, dtype=np.int64)
+    for i, site in enumerate(sites):
+        key = blocks * n_alleles + H[active, site]
+        order = key.argsort(kind='stable')
+        active, key = active[order], key[order]
+
+        # few sites per decay are typical, so the loop body avoids NumPy helper overheads
+        change = np.empty(len(key), dtype=bool)
+        change[0] = True
+        np.not_equal(key[1:], key[:-1], out=change[1:])
+        starts = change.nonzero()[0]
+        sizes = np.empty_like(starts)
+        sizes[:-1] = starts[1:] - starts[:-1]
+        sizes[-1] = len(key) - starts[-1]
+        EHHs[i] = sizes @ (sizes - 1) / norm
+
+        if cutoff is not None and EHHs[i] < cutoff:
+            return EHHs[:i + 1]
+
+        shared = (sizes > 1).repeat(sizes)
+        if not shared.any():
+            break
+        active = active[shared]
+        blocks = change.cumsum()[shared]
+
+    if cutoff is not None:
+        return EHHs[:i + 1]
+
+    return EHHs
+
+
+def ehh_bidirectional(H, core, cutoff=None, max_sites=None, n_alleles=2, rows=None):
+    """
+    EHH decay on both sides of a core site at any index
+
+    Returns
+    -------
+    upstream, downstream : np.ndarray
+        ehh_decay towards smaller and larger indices, both start at the core
+    """
+    return (ehh_decay(H, core, -1, cutoff, max_sites, n_alleles, rows),
+            ehh_decay(H, core, 1, cutoff, max_sites, n_alleles, rows))
+
+
+def _integrate(EHHs, positions, core, direction):
+    # trapezoid area under the decay over the distances from the core
+    if len(EHHs) < 2:
+        return 0.0
+    sites = core + direction * np.arange(len(EHHs))
+    distances = np.abs(positions[sites] - positions[core])
+
+    return float(np.sum((EHHs[1:] + EHHs[:-1]) / 2 * np.diff(distances)))
+
+
+def integrated_haplotype_homozygosity(H, core, positions=None, cutoff=0.05, max_sites=None,
+                                      n_alleles=2, rows=None):
+    """
+    iHH: area under the EHH decay on both sides of the core,
+    each side integrated until the EHH drops below cutoff
+
+    Parameters
+    ----------
+    H : np.ndarray
+        (n_haplotypes, n_sites) uint8 matrix of alleles
+    core : Int
+        Index of the core site
+    positions : np.ndarray, optional
+        Physical or genetic positions of the sites, site indices by default
+    cutoff : Float, default=0.05
+    max_sites : Int, optional
+        Maximum number of sites per side
+    n_alleles : Int, default=2
+    rows : np.ndarray, optional
+        Indices of the haplotypes to use (see ehh_decay)
+
+    Returns
+    -------
+    iHH : Float
+    """
+    positions = np.arange(H.shape[1]) if positions is None else np.asarray(positions)
+    upstream, downstream = ehh_bidirectional(H, core, cutoff, max_sites, n_alleles, rows)
+
+    return _integrate(upstream, positions, core, -1) + _integrate(downstream, positions, core, 1)
+
+
+def ihs(H, core, positions=None, cutoff=0.05, ancestral=0, max_sites=None, n_alleles=2):
+    """
+    Unstandardized iHS: ln(iHH of the ancestral allele / iHH of the derived allele) at the core.
+    Usually standardized afterwards within bins of derived allele frequency.
+
+    Parameters
+    ----------
+    H : np.ndarray
+        (n_haplotypes, n_sites) uint8 matrix of alleles
+    core : Int
+    positions : np.ndarray, optional
+    cutoff : Float, default=0.05
+    ancestral : Int, default=0
+        Ancestral allele of the core, every other allele is derived
+    max_sites : Int, optional
+    n_alleles : Int, default=2
+
+    Returns
+    -------
+    iHS : Float
+        nan if an allele is carried by fewer than 2 haplotypes
+    """
+    is_ancestral = np.asarray(H[:, core]) == ancestral
+    if is_ancestral.sum() < 2 or (~is_ancestral).sum() < 2:
+        return np.nan
+
+    ihh_a = integrated_haplotype_homozygosity(H, core, positions, cutoff, max_sites, n_alleles,
+                                              np.flatnonzero(is_ancestral))
+    ihh_d = integrated_haplotype_homozygosity(H, core, positions, cutoff, max_sites, n_alleles,
+                                              np.flatnonzero(~is_ancestral))
+
+    return float(np.log(ihh_a / ihh_d))
+
+
+def xpehh(H, rows_a, rows_b, core, positions=None, cutoff=0.05, max_sites=None, n_alleles=2):
+    """
+    Unstandardized XP-EHH: ln(iHH of population a / iHH of population b) at the core.
+    Both populations are integrated over the same range:
+    on each side up to where the EHH of the pooled haplotypes drops below cutoff.
+    The populations are row indices of one matrix, so only the visited sites of H are read.
+
+    Parameters
+    ----------
+    H : np.ndarray
+        (n_haplotypes, n_sites) uint8 matrix of alleles (may be a np.memmap)
+    rows_a, rows_b : np.ndarray
+        Indices of the haplotypes of the two populations
+    core : Int
+    positions : np.ndarray, optional
+    cutoff : Float, default=0.05
+    max_sites : Int, optional
+    n_alleles : Int, default=2
+
+    Returns
+    -------
+    XP-EHH : Float
+    """
+    positions = np.arange(H.shape[1]) if positions is None else np.asarray(positions)
+    rows_a, rows_b = np.asarray(rows_a), np.asarray(rows_b)
+    pooled = np.concatenate([rows_a, rows_b])
+
+    ihh = np.zeros(2)
+    for direction in (-1, 1):
+        n_sites = len(ehh_decay(H, core, direction, cutoff, max_sites, n_alleles, pooled))
+        for j, rows in enumerate((rows_a, rows_b)):
+            EHHs = ehh_decay(H, core, direction, max_sites=n_sites, n_alleles=n_alleles, rows=rows)
+            ihh[j] += _integrate(EHHs, positions, core, direction)
+
+    return float(np.log(ihh[0] / ihh[1]))
 
 
 def ehh(allseqs):
     """
-    Calculates the EHH (extended haplotype homozygosity) metric for the aligned sequences, 
+    Calculates the EHH (extended haplotype homozygosity) metric for the aligned sequences,
     it is given that the main SNP is at position 0
 
     Parameters
@@ -16,11 +233,4 @@ def ehh(allseqs):
     EHHs : List[Float]
         EHH metric for step plot
     """
-    EHHs = []
-    nas = len(allseqs)
-    fnas = 1 / (nas * (nas - 1))
-    for t in range(2, len(allseqs[0])+1):
-        st_set = Counter([seq[0:t] for seq in allseqs])
-        EHHs.append(fnas * sum([v * (v - 1) for v in st_set.values()]))
-
-    return EHHs
\ No newline at end of file
+    return ehh_decay(haplotype_matrix(allseqs), 0, n_alleles=256)[1:].tolist()
@@ -1,24 +1,142 @@
-def fixation_index(p=None):
+import numpy as np
+
+
+def fst_components(p, n=None, method='nei'):
+    """
+    Numerator and denominator of the FST of every locus,
+    FST = numerator / denominator, ratio of averages = sum(numerator) / sum(denominator)
+
+    Parameters
+    ----------
+    p : np.ndarray
+        (n_loci, n_populations) allele frequencies
+    n : np.ndarray, optional
+        Sample sizes (haplotypes) of the populations, (n_populations,) or (n_loci, n_populations)
+    method : Str, default='nei'
+        'nei' - (ht - hs) / ht, populations weighted by n if given,
+        'hudson' - Hudson's estimator averaged over the pairs of populations (sample size corrected if n is given),
+        'wc' - Weir and Cockerham's theta for haploid samples (requires n)
+
+    Returns
+    -------
+    numerator, denominator : np.ndarray
+        (n_loci,) arrays, both 0 at monomorphic loci
+    """
+    p = np.asarray(p, dtype=float)
+    r = p.shape[-1]
+    if n is not None:
+        n = np.broadcast_to(np.asarray(n, dtype=float), p.shape)
+
+    if method == 'nei':
+        w = np.full(p.shape, 1 / r) if n is None else n / n.sum(axis=-1, keepdims=True)
+        p_mean = np.sum(w * p, axis=-1)
+        hs = np.sum(w * 2 * p * (1 - p), axis=-1)
+        ht = 2 * p_mean * (1 - p_mean)
+        return ht - hs, ht
+
+    if method == 'hudson':
+        i, j = np.triu_indices(r, 1)
+        p1, p2 = p[..., i], p[..., j]
+        numerator = (p1 - p2) ** 2
+        if n is not None:
+            numerator = numerator - p1 * (1 - p1) / (n[..., i] - 1) - p2 * (1 - p2) / (n[..., j] - 1)
+        denominator = p1 * (1 - p2) + p2 * (1 - p1)
+        return numerator.mean(axis=-1), denominator.mean(axis=-1)
+
+    if method == 'wc':
+        if n is None:
+            raise ValueError("Weir and Cockerham's estimator requires sample sizes n")
+        n_total = n.sum(axis=-1)
+        n_mean = n_total / r
+        n_c = (n_total - np.sum(n ** 2, axis=-1) / n_total) / (r - 1)
+        p_mean = np.sum(n * p, axis=-1) / n_total
+        s2 = np.sum(n * (p - p_mean[..., None]) ** 2, axis=-1) / ((r - 1) * n_mean)
+        x = p_mean * (1 - p_mean) - (r - 1) / r * s2
+        a = n_mean / n_c * (s2 - x / (n_mean - 1))
+        b = n_mean / (n_mean - 1) * x
+        return a, a + b
+
+    raise ValueError(f"Unknown method: {method}")
+
+
+def _ratio(numerator, denominator):
+    # FST of each locus, nan where the locus is monomorphic (denominator 0)
+    return np.divide(numerator, denominator, out=np.full(np.shape(numerator), np.nan), where=denominator != 0)
+
+
+def fixation_index(p=None, n=None, method='nei'):
     """
-    The FST index value of 1 represents complete isolation of the subgroups, 
+    The FST index value of 1 represents complete isolation of the subgroups,
     while the value 0 means complete overlap.
 
     Parameters
     ----------
-    p : List[Float]
-        p allele frequencies of each population
+    p : List[Float] or np.ndarray
+        p allele frequencies of each population,
+        or a (n_loci, n_populations) matrix of allele frequencies
+    n : np.ndarray, optional
+        Sample sizes of the populations, (n_populations,) or (n_loci, n_populations)
+    method : Str, default='nei'
+        Estimator 'nei', 'hudson' or 'wc' (see fst_components)
 
     Returns
     -------
     fst: Float
-        Fixation index
+        Fixation index of a single locus
+    or
+    fst: np.ndarray, fst_average: Float
+        FST of each locus (nan if monomorphic) and the ratio of averages over the loci
+    """
+    p = np.asarray(p, dtype=float)
+    numerator, denominator = fst_components(p, n, method)
+
+    if p.ndim == 1:
+        return float(_ratio(numerator, denominator))
+
+    return _ratio(numerator, denominator), float(_ratio(numerator.sum(), denominator.sum()))
+
+
+def pairwise_fixation_index(p, n=None, method='hudson'):
+    """
+    Ratio of averages FST over the loci of every pair of populations
+
+    Sums of Hudson's terms over the loci are sums of products of frequency columns
+    and come from one (n_populations, n_populations) matrix product,
+    other estimators (or sample sizes per locus) run fst_components over the loci for each pair.
+
+    Parameters
+    ----------
+    p : np.ndarray
+        (n_loci, n_populations) allele frequencies
+    n : np.ndarray, optional
+        Sample sizes, (n_populations,) or (n_loci, n_populations)
+    method : Str, default='hudson'
+
+    Returns
+    -------
+    fst : np.ndarray
+        (n_populations, n_populations) symmetric matrix, 0 on the diagonal
     """
-    p = np.array(p)
-    q = 1 - p
-    Aa = 2 * p * q
-    hs = np.mean(Aa)
-    ht = 2 * np.mean(p) * np.mean(q)
+    p = np.asarray(p, dtype=float)
+    r = p.shape[1]
+
+    if method == 'hudson' and (n is None or np.ndim(n) == 1):
+        gram = p.T @ p
+        squares, sums = np.diag(gram), p.sum(axis=0)
+        numerator = squares[:, None] + squares[None, :] - 2 * gram
+        if n is not None:
+            correction = (sums - squares) / (np.asarray(n, dtype=float) - 1)
+            numerator = numerator - correction[:, None] - correction[None, :]
+        denominator = sums[:, None] + sums[None, :] - 2 * gram
+    else:
+        numerator, denominator = np.zeros((r, r)), np.zeros((r, r))
+        for i, j in zip(*np.triu_indices(r, 1)):
+            pair_n = None if n is None else np.broadcast_to(n, p.shape)[:, [i, j]]
+            a, b = fst_components(p[:, [i, j]], pair_n, method)
+            numerator[i, j] = numerator[j, i] = a.sum()
+            denominator[i, j] = denominator[j, i] = b.sum()
 
-    fst = (ht - hs) / ht
+    fst = _ratio(numerator, denominator)
+    np.fill_diagonal(fst, 0)
 
-    return fs
\ No newline at end of file
+    return fst
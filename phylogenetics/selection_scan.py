@@ -0,0 +1,221 @@
+import csv
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from extended_haplotype_homozygosity import integrated_haplotype_homozygosity
+from fixation_index import fst_components
+
+
+class GenotypeMatrix:
+    """
+    Memory-mapped 0/1 haplotype matrix (n_haplotypes, n_sites), read in blocks of sites.
+
+    Stored either as a uint8 .npy file or as bits packed along the sites
+    (np.packbits(H, axis=1), .npy or raw bytes). Pickles as its file description,
+    so process pool workers map the file themselves instead of receiving copies.
+
+    Parameters
+    ----------
+    path : Str
+    packed : Bool, default=False
+        Sites are packed 8 per byte
+    n_sites : Int, optional
+        Number of sites of a packed matrix (the last byte may be padded)
+    n_haplotypes : Int, optional
+        Number of haplotypes of a raw (not .npy) file
+    """
+
+    def __init__(self, path, packed=False, n_sites=None, n_haplotypes=None):
+        self.path = path
+        self.packed = packed
+        self.n_haplotypes = n_haplotypes
+
+        if path.endswith('.npy'):
+            self.data = np.load(path, mmap_mode='r')
+        else:
+            self.data = np.memmap(path, dtype=np.uint8, mode='r').reshape(n_haplotypes, -1)
+
+        self.n_sites = n_sites if n_sites is not None else self.data.shape[1] * (8 if packed else 1)
+        self.shape = (self.data.shape[0], self.n_sites)
+
+    def __reduce__(self):
+        return GenotypeMatrix, (self.path, self.packed, self.n_sites, self.n_haplotypes)
+
+    def read(self, start, stop):
+        """
+        Sites start..stop - 1 of every haplotype as a uint8 array
+        """
+        start, stop = max(start, 0), min(stop, self.n_sites)
+        if not self.packed:
+            return np.asarray(self.data[:, start:stop], dtype=np.uint8)
+
+        block = np.unpackbits(self.data[:, start // 8:(stop + 7) // 8], axis=1)
+        return block[:, start % 8:start % 8 + stop - start]
+
+
+def allele_frequencies(G, populations, n_populations=None):
+    """
+    Allele frequency of every site in every population in one product
+
+    Parameters
+    ----------
+    G : np.ndarray
+        (n_haplotypes, n_sites) 0/1 matrix
+    populations : np.ndarray
+        Population label 0..n_populations - 1 of each haplotype
+
+    Returns
+    -------
+    p : np.ndarray
+        (n_sites, n_populations) frequencies
+    n : np.ndarray
+        (n_populations,) sample sizes
+    """
+    populations = np.asarray(populations)
+    n_populations = n_populations or int(populations.max()) + 1
+    membership = np.zeros((n_populations, len(populations)), dtype=np.float32)
+    membership[populations, np.arange(len(populations))] = 1
+
+    n = membership.sum(axis=1)
+    return (membership @ G).T / n, n
+
+
+def _scan_chunk(G, populations, n_populations, start, stop, positions, flank, cutoff, min_maf, fst_method):
+    # worker of selection_scan: FST terms of the sites start..stop - 1 and iHS of their core SNPs
+    lo = max(start - flank, 0)
+    block = G.read(lo, stop + flank)
+    p, n = allele_frequencies(block[:, start - lo:stop - lo], populations, n_populations)
+    numerator, denominator = fst_components(p, n, fst_method)
+
+    records = []
+    for k in range(n_populations):
+        members = np.flatnonzero(populations == k)
+        for site in np.flatnonzero(np.minimum(p[:, k], 1 - p[:, k]) >= min_maf):
+            core = start - lo + site
+            # view of the columns a decay can reach, carriers passed as row indices
+            a = max(core - flank, 0)
+            window = block[:, a:core + flank + 1]
+            derived = block[members, core] == 1
+            ihh_a = integrated_haplotype_homozygosity(window, core - a, positions[a:], cutoff, flank + 1,
+                                                      rows=members[~derived])
+            ihh_d = integrated_haplotype_homozygosity(window, core - a, positions[a:], cutoff, flank + 1,
+                                                      rows=members[derived])
+            # as ihs: undefined unless both alleles are shared by 2 haplotypes
+            with np.errstate(divide='ignore', invalid='ignore'):
+                score = np.log(np.divide(ihh_a, ihh_d)) if 2 <= derived.sum() <= len(members) - 2 else np.nan
+            records.append((start + site, k, p[site, k], ihh_a, ihh_d, score))
+
+    return numerator, denominator, records
+
+
+def selection_scan(G, populations, output, positions=None, window_size=100000, window_step=None,
+                   chunk_size=10000, flank=2000, cutoff=0.05, min_maf=0.05, fst_method='nei', n_workers=None):
+    """
+    Genome-wide scan of a memory-mapped haplotype matrix: windowed FST between the populations
+    and per-core-SNP iHH/iHS within each population.
+
+    Chunks of chunk_size sites (plus flank sites on each side for the EHH decays) are processed
+    by a process pool and written to disk in chromosome order. At most 2 * n_workers chunks
+    are in flight at once, so memory is bounded by a few chunks whatever the chromosome length.
+    Windowed FST is the ratio of averages sum(numerator) / sum(denominator) (see fst_components)
+    over the sites of the window, summed with running prefix sums across chunks.
+
+    Parameters
+    ----------
+    G : GenotypeMatrix
+        (n_haplotypes, n_sites) 0/1 haplotypes, 1 - derived allele
+    populations : np.ndarray
+        Population label 0..n_populations - 1 of each haplotype
+    output : Str
+        Prefix of the output files <output>_fst.tsv and <output>_ihs.tsv
+    positions : np.ndarray, optional
+        Increasing positions of the sites, site indices by default
+    window_size : Float, default=100000
+        Window length in units of positions
+    window_step : Float, optional
+        Distance between window starts, window_size by default
+    chunk_size : Int, default=10000
+    flank : Int, default=2000
+        Maximum number of sites of an EHH decay on each side of a core
+    cutoff : Float, default=0.05
+        EHH cutoff of the iHH integrals
+    min_maf : Float, default=0.05
+        Minimum minor allele frequency (within the population) of a core SNP
+    fst_method : Str, default='nei'
+        FST estimator 'nei', 'hudson' or 'wc'
+    n_workers : Int, optional
+        Number of processes, os.cpu_count() by default
+
+    Returns
+    -------
+    paths : Tuple[Str]
+        Paths of the FST and iHS tables (unstandardized iHS)
+    """
+    populations = np.asarray(populations)
+    n_populations = int(populations.max()) + 1
+    n_sites = G.shape[1]
+    positions = np.arange(n_sites) if positions is None else np.asarray(positions)
+    window_step = window_step or window_size
+
+    window_starts = np.arange(positions[0], positions[-1] + 1, window_step)
+    bounds = np.concatenate([np.searchsorted(positions, window_starts),
+                             np.searchsorted(positions, window_starts + window_size)])
+    prefix = np.zeros((2, len(bounds)))
+    total = np.zeros(2)
+
+    chunks = [(start, min(start + chunk_size, n_sites)) for start in range(0, n_sites, chunk_size)]
+    fst_path, ihs_path = f'{output}_fst.tsv', f'{output}_ihs.tsv'
+
+    n_workers = n_workers or os.cpu_count()
+
+    def completed(pool):
+        # results in chromosome order, at most 2 * n_workers chunks submitted ahead
+        pending = deque()
+        for start, stop in chunks:
+            lo = max(start - flank, 0)
+            pending.append(((start, stop), pool.submit(
+                _scan_chunk, G, populations, n_populations, start, stop,
+                positions[lo:stop + flank] - positions[lo], flank, cutoff, min_maf, fst_method)))
+            if len(pending) >= 2 * n_workers:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+    with ProcessPoolExecutor(n_workers) as pool, open(ihs_path, 'w', newline='') as file:
+        writer = csv.writer(file, delimiter='\t')
+        writer.writerow(['site', 'position', 'population', 'derived_frequency', 'ihh_ancestral', 'ihh_derived', 'ihs'])
+
+        for (start, stop), (numerator, denominator, records) in completed(pool):
+            # prefix sums at the window bounds inside this chunk
+            inside = (bounds >= start) & (bounds < stop)
+            for j, values in enumerate((numerator, denominator)):
+                running = np.concatenate([[0], np.cumsum(values)])
+                prefix[j, inside] = total[j] + running[bounds[inside] - start]
+                total[j] += running[-1]
+
+            writer.writerows((site, positions[site], k, f, a, d, s) for site, k, f, a, d, s in records)
+
+    prefix[:, bounds == n_sites] = total[:, None]
+    lo, hi = np.split(prefix, 2, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fst = (hi[0] - lo[0]) / (hi[1] - lo[1])
+
+    counts = np.diff(np.split(bounds, 2), axis=0)[0]
+    with open(fst_path, 'w', newline='') as file:
+        writer = csv.writer(file, delimiter='\t')
+        writer.writerow(['start', 'stop', 'n_sites', 'fst'])
+        writer.writerows(zip(window_starts, window_starts + window_size, counts, fst))
+
+    return fst_path, ihs_path
+
+
+# Example:
+#
+# np.save('chr1.npy', np.packbits(haplotypes, axis=1))
+# G = GenotypeMatrix('chr1.npy', packed=True, n_sites=haplotypes.shape[1])
+# selection_scan(G, populations, 'chr1', positions=positions, window_size=50000)
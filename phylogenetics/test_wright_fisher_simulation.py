@@ -0,0 +1,38 @@
+import numpy as np
+
+from wright_fisher_simulation import simulate_wright_fisher, wright_fisher_distribution
+
+
+def _neutral_variance(p, Ne, t):
+    # closed form: Var p_t = p (1 - p) (1 - (1 - 1/2Ne)^t)
+    return p * (1 - p) * (1 - (1 - 1 / (2 * Ne))**t)
+
+
+def _moments(result):
+    mean = result['probabilities'] @ result['frequencies']
+    return mean, result['probabilities'] @ result['frequencies']**2 - mean**2
+
+
+def test_matrix_matches_closed_form_variance():
+    mean, variance = _moments(wright_fisher_distribution(0.2, 50, 100, method='matrix'))
+    np.testing.assert_allclose(mean, 0.2, atol=1e-12)
+    np.testing.assert_allclose(variance, _neutral_variance(0.2, 50, 100), rtol=1e-9)
+
+
+def test_diffusion_matches_closed_form_variance_for_large_ne():
+    for p, Ne, t in [(0.1, 10**6, 10**4), (0.5, 10**7, 10**5), (0.3, 10**4, 10**4)]:
+        mean, variance = _moments(wright_fisher_distribution(p, Ne, t, method='diffusion'))
+        np.testing.assert_allclose(mean, p, atol=1e-3)
+        np.testing.assert_allclose(variance, _neutral_variance(p, Ne, t), rtol=0.02)
+
+
+def test_simulation_matches_closed_form_variance():
+    result = simulate_wright_fisher(0.3, 100, 20000, 50, rng=1)
+    np.testing.assert_allclose(result['p_final'].mean(), 0.3, atol=0.01)
+    np.testing.assert_allclose(result['p_final'].var(), _neutral_variance(0.3, 100, 50), rtol=0.05)
+
+
+def test_counts_follow_the_schedule_after_absorption():
+    result = simulate_wright_fisher(1.0, lambda g: 10 if g < 50 else 1000, 2, 100, record='full', dtype=np.uint32)
+    trials = np.where(result['generations'] < 50, 20, 2000)
+    np.testing.assert_array_equal(result['trajectories'], np.repeat(trials[:, None], 2, axis=1))
@@ -1,6 +1,396 @@
-import matplotlib.pyplot as plt
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import numpy as np
 
+
+def expected_frequency(p, s=0, h=0.5, u=0, v=0):
+    """
+    Allele frequency expected in the next generation before drift: 
+    selection on genotype fitnesses AA: 1 + s, Aa: 1 + hs, aa: 1, 
+    then mutation A -> a at rate u and a -> A at rate v
+    """
+    if s:
+        q = 1 - p
+        mean_fitness = p * p * (1 + s) + 2 * p * q * (1 + h * s) + q * q
+        p = (p * p * (1 + s) + p * q * (1 + h * s)) / mean_fitness
+    if u or v:
+        p = p * (1 - u) + (1 - p) * v
+
+    return p
+
+
+def ne_schedule(Ne, num_generations):
+    """
+    Effective population size of every generation 0..num_generations
+
+    Parameters:
+    -----
+    Ne: Int, array_like or Func(g)->Int
+        Constant size, num_generations + 1 sizes, or size of generation g
+
+    Returns
+    -----
+    schedule: np.ndarray
+    """
+    if callable(Ne):
+        schedule = np.array([Ne(g) for g in range(num_generations + 1)])
+    else:
+        schedule = np.broadcast_to(np.asarray(Ne), (num_generations + 1,))
+
+    return schedule.astype(np.int64)
+
+
+def schedule_from_skyline(times, sizes, num_generations):
+    """
+    Ne(t) schedule (forward in time) from a skyline: 
+    sizes[i] is the population size up to times[i] generations before present,
+    the last size holds before the last time
+
+    Returns
+    -----
+    schedule: np.ndarray
+        Ne of generations 0..num_generations, generation num_generations is the present
+    """
+    before_present = num_generations - np.arange(num_generations + 1)
+    i = np.minimum(np.searchsorted(times, before_present), len(sizes) - 1)
+
+    return np.rint(np.asarray(sizes, dtype=float)[i]).astype(np.int64)
+
+
+def simulate_wright_fisher(p, Ne, num_replicates, num_generations, record='final', thin=1,
+                           dtype=np.float32, rng=None, s=0, h=0.5, u=0, v=0):
+    """
+    Vectorized Wright-Fisher engine: all replicates advance together,
+    one binomial draw per generation for the replicates still segregating
+    (replicates that reached fixation or loss are dropped from the draws).
+
+    Every generation the frequency expected after selection and mutation (expected_frequency)
+    is sampled with 2Ne(t) trials.
+
+    Parameters:
+    -----
+    p: Float
+        Allele frequency
+    Ne: Int, array_like or Func(g)->Int
+        Effective population size, constant or a schedule Ne(t) (see ne_schedule, schedule_from_skyline)
+    num_replicates: Int
+    num_generations: Int
+    record: Str, default='final'
+        'final' - only the final frequencies,
+        'thinned' - trajectories every thin generations,
+        'full' - trajectories of every generation
+    thin: Int, default=1
+        Recording interval of 'thinned'
+    dtype: np.dtype, default=np.float32
+        Type of the trajectories, np.float32 stores frequencies, np.uint32 allele counts (of 2Ne(t))
+    rng: np.random.Generator, optional
+        Source of the binomial draws
+    s: Float, default=0
+        Selection coefficient of the allele
+    h: Float, default=0.5
+        Dominance coefficient
+    u: Float, default=0
+        Mutation rate from the allele
+    v: Float, default=0
+        Mutation rate to the allele
+
+    Returns
+    -----
+    result: Dict
+        p_final - final allele frequencies (num_replicates,),
+        absorbed_at - generation of fixation or loss, -1 if still segregating 
+        (with mutation only a state the mutation can not leave is absorbing),
+        generations - recorded generations, trajectories - (len(generations), num_replicates) or None
+    """
+    if record not in ('final', 'thinned', 'full'):
+        raise ValueError(f"Unknown record: {record}")
+
+    rng = np.random.default_rng(rng)
+    trials = 2 * ne_schedule(Ne, num_generations)
+
+    freq = np.full(num_replicates, round(p * trials[0]) / trials[0])
+    absorbed_at = np.full(num_replicates, -1, dtype=np.int64)
+
+    def absorbed(f):
+        return ((f == 0) & (v == 0)) | ((f == 1) & (u == 0))
+
+    absorbed_at[absorbed(freq)] = 0
+    active = np.flatnonzero(absorbed_at < 0)
+
+    step = 1 if record == 'full' else thin
+    generations = np.arange(0, num_generations + 1, step) if record != 'final' else np.array([num_generations])
+    trajectories = None
+    if record != 'final':
+        trajectories = np.empty((len(generations), num_replicates), dtype=dtype)
+
+    def write(rows, g):
+        # g: generation (or generations) of the rows, counts are of their own 2Ne(g)
+        if np.issubdtype(dtype, np.integer):
+            trajectories[rows] = np.rint(np.multiply.outer(trials[g], freq))
+        else:
+            trajectories[rows] = freq
+
+    if record != 'final':
+        write(0, 0)
+
+    for g in range(1, num_generations + 1):
+        if len(active):
+            drawn = rng.binomial(trials[g], expected_frequency(freq[active], s, h, u, v)) / trials[g]
+            freq[active] = drawn
+
+            done = absorbed(drawn)
+            if done.any():
+                absorbed_at[active[done]] = g
+                active = active[~done]
+
+        if record != 'final' and g % step == 0:
+            write(g // step, g)
+
+        # nothing left to draw: the remaining rows repeat the last state
+        if not len(active):
+            if record != 'final':
+                write(slice(g // step + 1, None), generations[g // step + 1:])
+            break
+
+    return {'p_final': freq, 'absorbed_at': absorbed_at,
+            'generations': generations, 'trajectories': trajectories}
+
+
+def _transition_matrix(Ne, s, h, u, v, states_from, method, n_grid, width=8, generations=1):
+    """
+    Sparse transition matrix of the allele frequency over generations (1 for 'matrix'), 
+    rows: frequencies states_from, columns: frequencies after these generations.
+
+    'matrix' - exact Wright-Fisher chain, columns are the 2Ne + 1 allele counts, binomial rows
+    'diffusion' - n_grid frequency classes, rows are the normal (diffusion) kernel
+    with mean m, expected_frequency applied generations times, 
+    and variance m(1 - m)(1 - (1 - 1/2Ne)^generations) (exact for neutral drift),
+    mass beyond 0 and 1 is absorbed there.
+    Rows are truncated to width standard deviations around the mean.
+    """
+    from scipy import sparse, stats
+
+    m = states_from
+    for _ in range(generations):
+        m = expected_frequency(m, s, h, u, v)
+    sd = np.sqrt(m * (1 - m) * -np.expm1(generations * np.log1p(-1 / (2 * Ne))))
+
+    if method == 'matrix':
+        n_to = 2 * Ne + 1
+        half = int(np.ceil(width * sd.max() * 2 * Ne)) + 1
+        columns = np.rint(m * 2 * Ne).astype(np.int64)[:, None] + np.arange(-half, half + 1)
+        inside = (columns >= 0) & (columns < n_to)
+        columns = np.clip(columns, 0, n_to - 1)
+        values = np.where(inside, stats.binom.pmf(columns, 2 * Ne, m[:, None]), 0)
+    else:
+        n_to = n_grid
+        grid = np.linspace(0, 1, n_grid)
+        edges = np.concatenate([[-np.inf], (grid[1:] + grid[:-1]) / 2, [np.inf]])
+        half = int(np.ceil(width * sd.max() * (n_grid - 1))) + 1
+        columns = np.rint(m * (n_grid - 1)).astype(np.int64)[:, None] + np.arange(-half, half + 1)
+        columns = np.clip(columns, 0, n_grid - 1)
+        # point masses (sd = 0) fall in the class of their mean
+        z = (edges[None, :] - m[:, None]) / np.where(sd > 0, sd, 1)[:, None]
+        z = np.where(sd[:, None] > 0, z, np.where(edges[None, :] > m[:, None], np.inf, -np.inf))
+        cdf = stats.norm.cdf(z)
+        rows = np.arange(len(m))[:, None]
+        values = cdf[rows, columns + 1] - cdf[rows, columns]
+        # clipped duplicates of the first and last class would be counted twice
+        duplicate = np.zeros(columns.shape, bool)
+        duplicate[:, 1:] = columns[:, 1:] == columns[:, :-1]
+        values = np.where(duplicate, 0, values)
+
+    rows = np.repeat(np.arange(len(m)), columns.shape[1])
+    T = sparse.csr_matrix((values.ravel(), (rows, columns.ravel())), shape=(len(m), n_to))
+    T.eliminate_zeros()
+
+    return T
+
+
+def wright_fisher_distribution(p, Ne, num_generations, s=0, h=0.5, u=0, v=0,
+                               method='diffusion', n_grid=1001):
+    """
+    Allele frequency distribution after num_generations without simulating replicates:
+    the distribution is propagated with sparse matrix-vector products.
+
+    'matrix' is the exact Wright-Fisher Markov chain on 2Ne + 1 allele counts (large Ne means large matrices),
+    one product per generation.
+    'diffusion' approximates it on n_grid frequency classes with a normal kernel 
+    (mean and variance of the diffusion approximation). With a large Ne one generation moves 
+    the frequency by less than a class, so each product spans as many generations of constant Ne 
+    as needed for a standard deviation of 5 classes at frequency 1/2 (about 200 Ne / n_grid^2 generations),
+    then the classes add a variance of about 1/300 of the kernel's. Its cost does not depend on Ne.
+    Matrices are cached per (Ne, generations), so a schedule Ne(t) with few distinct sizes stays cheap.
+
+    Parameters:
+    -----
+    p: Float
+        Allele frequency
+    Ne: Int, array_like or Func(g)->Int
+        Effective population size, constant or a schedule Ne(t) (see ne_schedule)
+    num_generations: Int
+    s, h, u, v: Float
+        Selection, dominance and mutation rates (see simulate_wright_fisher)
+    method: Str, default='diffusion'
+        'diffusion' or 'matrix'
+    n_grid: Int, default=1001
+        Number of frequency classes of 'diffusion'
+
+    Returns
+    -----
+    result: Dict
+        frequencies - states, probabilities - their probabilities, 
+        loss_probability, fixation_probability - probabilities of frequency 0 and 1
+    """
+    if method not in ('diffusion', 'matrix'):
+        raise ValueError(f"Unknown method: {method}")
+
+    schedule = ne_schedule(Ne, num_generations)
+
+    def states(Ne_g):
+        return np.arange(2 * Ne_g + 1) / (2 * Ne_g) if method == 'matrix' else np.linspace(0, 1, n_grid)
+
+    frequencies = states(schedule[0])
+    probabilities = np.zeros(len(frequencies))
+    probabilities[np.argmin(np.abs(frequencies - p))] = 1
+
+    cache = {}
+    g = 0
+    while g < num_generations:
+        N = schedule[g + 1]
+        step = 1
+        if method == 'diffusion':
+            # generations of constant Ne spanned by one product
+            step = max(1, int(200 * N / (n_grid - 1)**2))
+            same = np.flatnonzero(schedule[g + 1:g + 1 + step] != N)
+            step = same[0] if len(same) else min(step, num_generations - g)
+
+        key = (schedule[g], N) if method == 'matrix' else (N, step)
+        if key not in cache:
+            cache[key] = _transition_matrix(N, s, h, u, v, frequencies, method, n_grid, generations=step)
+        probabilities = cache[key].T @ probabilities
+        g += step
+        frequencies = states(N)
+
+    return {'frequencies': frequencies, 'probabilities': probabilities,
+            'loss_probability': probabilities[0], 'fixation_probability': probabilities[-1]}
+
+
+def plot_trajectories(result, ax=None):
+    """
+    Plot the recorded trajectories of simulate_wright_fisher (one line per replicate)
+    """
+    import matplotlib.pyplot as plt
+
+    ax = ax or plt.gca()
+    trajectories = result['trajectories']
+    if np.issubdtype(trajectories.dtype, np.integer):
+        raise ValueError("Trajectories are allele counts, plot frequencies (dtype=np.float32)")
+
+    ax.plot(result['generations'], trajectories, linewidth=1)
+    ax.set_xlabel('Generation')
+    ax.set_ylabel('Allele frequency')
+
+    return ax
+
+
+def _run_shard(p, Ne, num_replicates, num_generations, seed, edges, model):
+    # worker of sweep_wright_fisher: summary of one shard of replicates
+    result = simulate_wright_fisher(p, Ne, num_replicates, num_generations,
+                                    rng=np.random.default_rng(seed), **model)
+    fixed = result['p_final'] == 1
+    lost = result['p_final'] == 0
+
+    return {'n_fixed': int(fixed.sum()), 'n_lost': int(lost.sum()),
+            'p_sum': float(result['p_final'].sum()),
+            'fixation_times': np.histogram(result['absorbed_at'][fixed], bins=edges)[0],
+            'loss_times': np.histogram(result['absorbed_at'][lost], bins=edges)[0]}
+
+
+def sweep_wright_fisher(params, num_replicates, seed=None, shard_size=10000, bins=50,
+                        n_workers=None, progress=True, **model):
+    """
+    Parameter sweep of simulate_wright_fisher over a process pool.
+
+    Replicates of every parameter set are split into shards of shard_size,
+    every shard draws from its own generator spawned from np.random.SeedSequence(seed),
+    shards are fixed by shard_size only and merged in order, 
+    so results are bit-for-bit identical for any number of workers.
+
+    Parameters:
+    -----
+    params: List[Tuple(Float, Int, Int)]
+        (p, Ne, num_generations) of every run
+    num_replicates: Int
+        Replicates per parameter set
+    seed: Int, optional
+        Root seed of the sweep
+    shard_size: Int, default=10000
+        Replicates per task
+    bins: Int, default=50
+        Number of bins of the time-to-absorption histograms (over 0..num_generations)
+    n_workers: Int, optional
+        Size of the pool, the number of CPUs by default
+    progress: Bool, default=True
+        Print progress and throughput (replicates/s) to stderr
+    model:
+        s, h, u, v passed to simulate_wright_fisher
+
+    Returns
+    -----
+    results: List[Dict]
+        For every parameter set: p, Ne, num_generations, fixation_probability, loss_probability,
+        mean_p_final, fixation_times and loss_times histograms (counts) with their edges
+    """
+    n_workers = n_workers or os.cpu_count()
+    root = np.random.SeedSequence(seed)
+
+    tasks = []
+    for i, ((p, Ne, num_generations), sequence) in enumerate(zip(params, root.spawn(len(params)))):
+        edges = np.linspace(0, num_generations + 1, bins + 1)
+        sizes = [shard_size] * (num_replicates // shard_size)
+        if num_replicates % shard_size:
+            sizes.append(num_replicates % shard_size)
+        for size, shard_seed in zip(sizes, sequence.spawn(len(sizes))):
+            tasks.append((i, (p, Ne, size, num_generations, shard_seed, edges, model)))
+
+    summaries = [None] * len(tasks)
+    start = time.perf_counter()
+    done = replicates = 0
+    with ProcessPoolExecutor(max_workers=n_workers) as ex:
+        futures = {ex.submit(_run_shard, *args): j for j, (_, args) in enumerate(tasks)}
+        for future in as_completed(futures):
+            j = futures[future]
+            summaries[j] = future.result()
+
+            done += 1
+            replicates += tasks[j][1][2]
+            if progress:
+                elapsed = time.perf_counter() - start
+                print(f"\r{done}/{len(tasks)} shards, {replicates / elapsed:.3g} replicates/s",
+                      end='' if done < len(tasks) else '\n', file=sys.stderr, flush=True)
+
+    results = []
+    for i, (p, Ne, num_generations) in enumerate(params):
+        shards = [summary for (k, _), summary in zip(tasks, summaries) if k == i]
+        n_fixed = sum(shard['n_fixed'] for shard in shards)
+        n_lost = sum(shard['n_lost'] for shard in shards)
+        results.append({
+            'p': p, 'Ne': Ne, 'num_generations': num_generations,
+            'fixation_probability': n_fixed / num_replicates,
+            'loss_probability': n_lost / num_replicates,
+            'mean_p_final': sum(shard['p_sum'] for shard in shards) / num_replicates,
+            'fixation_times': sum(shard['fixation_times'] for shard in shards),
+            'loss_times': sum(shard['loss_times'] for shard in shards),
+            'edges': np.linspace(0, num_generations + 1, bins + 1),
+        })
+
+    return results
+
+
 def wright_fisher_simulation(p, Ne, num_replicates, num_generations):
     """
     Wright-Fisher model describes change in the frequency of an existing allele 
@@ -12,6 +402,9 @@ def wright_fisher_simulation(p, Ne, num_replicates, num_generations):
     - probability of allele elimination also depends on population size 
     the probability is higher if the population is smaller
 
+    Runs simulate_wright_fisher with full trajectories and plots them,
+    use simulate_wright_fisher directly for large runs (no plot, final frequencies only).
+
     Parameters:
     -----
     p: Float
@@ -21,25 +414,18 @@ def wright_fisher_simulation(p, Ne, num_replicates, num_generations):
     num_replicates: Int
     num_generations: Int
     """
+    import matplotlib.pyplot as plt
 
-    trials = Ne * 2
-
-    p_finals = []
-    for r in tqdm(range(num_replicates)):
-        P = [p]
-        for g in range(num_generations):
-            p_success = P[-1]
-            P.append(np.random.binomial(trials, p_success) / trials)
-
-        p_final = P[-1]
-        p_finals.append(p_final)
-        plt.plot(P, linewidth=1)
-
+    result = simulate_wright_fisher(p, Ne, num_replicates, num_generations, record='full')
+    plot_trajectories(result)
     plt.show()
 
-    return p_finals
+    return result['p_final'].tolist()
 
 
 # usage :
 # num_replicates, num_generations = 1000, 300
-# population = wright_fisher_simulation(0.1, 1000, num_replicates, num_generations)
\ No newline at end of file
+# population = wright_fisher_simulation(0.1, 1000, num_replicates, num_generations)
+# result = simulate_wright_fisher(0.1, 1000, 10**5, 10**4)  # final frequencies only
+# results = sweep_wright_fisher([(0.1, 100, 1000), (0.1, 1000, 10**4)], 10**5, seed=42)
+# distribution = wright_fisher_distribution(0.1, 10**6, 10**4, s=1e-4, method='diffusion')
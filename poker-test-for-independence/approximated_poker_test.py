@@ -1,8 +1,74 @@
-from functools import lru_cache, reduce
-import operator
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy.stats import chisquare
 
 
+@lru_cache(maxsize=64)
+def stirling2nd_row(n):
+    """
+    Stirling numbers of the second kind S(n, 0..n), built iteratively row by row:
+    S(n, k) = k * S(n - 1, k) + S(n - 1, k - 1)
+    """
+    row = [1]
+    for m in range(1, n + 1):
+        row = [0] + [j * (row[j] if j < m else 0) + row[j - 1] for j in range(1, m + 1)]
+
+    return tuple(row)
+
+
+@lru_cache(maxsize=256)
+def poker_probabilities(k, d):
+    """
+    Exact probabilities of r = 1..k distinct values in a group of length k with d bins,
+    Pr = d(d-1)..(d-r+1) / d^k * S(k, r), the falling factorial is built in the same pass
+
+    Returns
+    -------
+    p : Tuple[Fraction]
+        p[r - 1] is the probability of r distinct values
+    """
+    stirling = stirling2nd_row(k)
+
+    p = []
+    falling = 1
+    for r in range(1, k + 1):
+        falling *= d - r + 1
+        p.append(Fraction(falling * stirling[r], d**k))
+
+    return tuple(p)
+
+
+def count_full_groups(X, k, d, chunk_size=2**20):
+    """
+    Compute the frequencies of r distinct numbers in every group of length k of X 
+    (groups cut by the end of X are not counted)
+
+    The groups are counted chunk by chunk: X is quantised to bins, 
+    the groups are a strided (chunk, k) view, sorted along the rows, 
+    the number of distinct values is 1 + the number of non-zero differences.
+
+    Returns
+    -------
+    counts : np.ndarray
+        counts[r] groups with r distinct numbers, r = 0..k
+    """
+    counts = np.zeros(k + 1, dtype=np.int64)
+    n_full = max(len(X) - k + 1, 0)
+
+    for start in range(0, n_full, chunk_size):
+        stop = min(start + chunk_size, n_full)
+        # int() truncates towards zero, as astype does
+        bins = (np.asarray(X[start:stop + k - 1], dtype=float) * d).astype(np.int64)
+        groups = np.sort(sliding_window_view(bins, k), axis=1)
+        distinct = 1 + np.count_nonzero(np.diff(groups, axis=1), axis=1)
+        counts += np.bincount(distinct, minlength=k + 1)
+
+    return counts
+
+
 class ApproximatedPokerTest:
     """
     Approximated Poker Test for testing random number generators
@@ -13,6 +79,8 @@ class ApproximatedPokerTest:
         Length of the group
     d : Int, default=10
         Number of bins
+    chunk_size : Int, default=2**20
+        Number of groups counted at once (bounds the memory used by the test)
 
     Example
     ----------
@@ -34,55 +102,59 @@ class ApproximatedPokerTest:
 
     """
 
-    def __init__(self, k, d=10):
+    def __init__(self, k, d=10, chunk_size=2**20):
         self.k = k
         self.d = d
+        self.chunk_size = chunk_size
 
         self._compute_p(k, d)
 
-    @lru_cache
     def _get_stirling2nd(self, n, k):
         """
         Compute Stirling number of the second kind: 
         the number of ways to divide a set of n objects into k non-empty subsets
         """
-        if n == k == 0:
-            return 1
-        if (n > 0 and k == 0) or (n == 0 and k > 0):
-            return 0
-        if n == k:
-            return 1
-        if k > n:
-            return 0
-        result = k * \
-            self._get_stirling2nd(n - 1, k) + \
-            self._get_stirling2nd(n - 1, k - 1)
-
-        return result
+        return stirling2nd_row(n)[k] if 0 <= k <= n else 0
 
     def _compute_p(self, k, d):
         """
         Compute the probability of obtaining r distinct values in the group of length k.
-        Pr = (d(d-1) .. (d-r-1))/d^k * s(n,k)
+        Pr = (d(d-1) .. (d-r+1))/d^k * s(n,k)
+
+        The exact table is shared by all instances (poker_probabilities).
         """
-        self.p = {r: 0 for r in range(1, k + 1)}
-        for r in range(1, k + 1):
-            self.p[r] = d * reduce(operator.mul, [d - i
-                                                  for i in range(1, r)], 1)
-            self.p[r] /= d**k
-            self.p[r] *= self._get_stirling2nd(k, r)
+        self.p = {r: float(p) for r, p in enumerate(poker_probabilities(k, d), start=1)}
 
     def _count_all_k_series(self, X):
         """
         Compute the frequencies of r distinct numbers in the group k in the sample X
+
+        Every position starts a group, the last k - 1 groups are shorter (cut by the end of X).
         """
-        self.kseq_cnt = {r: 0 for r in range(1, self.k + 1)}
+        counts = count_full_groups(X, self.k, self.d, self.chunk_size)
+        self.kseq_cnt = {r: int(counts[r]) for r in range(1, self.k + 1)}
+
+        # short groups at the tail of the sample
+        self._count_short_groups(X[max(len(X) - self.k + 1, 0):])
 
-        for i in range(0, len(X)):
-            kseq = X[i:i + self.k]
-            kseq = [int(f * self.d) for f in kseq]
+    def _count_short_groups(self, tail):
+        """
+        Add the groups starting in tail (the last k - 1 numbers of the sample) to kseq_cnt
+        """
+        for i in range(0, len(tail)):
+            kseq = [int(f * self.d) for f in tail[i:i + self.k]]
             self.kseq_cnt[len(set(kseq))] += 1
 
+    def _chisquare(self, N):
+        """
+        Chi2 test of kseq_cnt against the expected frequencies in a sample of size N
+        """
+        expected = {k: v * N for k, v in self.p.items()}
+        observed = {k: v for k, v in sorted(
+            self.kseq_cnt.items(), key=lambda x: x[0])}
+
+        return expected, observed, chisquare(list(observed.values()), list(expected.values()))
+
     def test(self, X):
         """
         Run test
@@ -98,16 +170,131 @@ class ApproximatedPokerTest:
             Chi2 statistic and p-value
         """
         self._count_all_k_series(X)
-        N = len(X)
-        expected = {k: v * N for k, v in self.p.items()}
-        observed = {k: v for k, v in sorted(
-            self.kseq_cnt.items(), key=lambda x: x[0])}
+        expected, observed, statistics = self._chisquare(len(X))
 
         print(f'observed~expected')
         for o, e in zip(observed.values(), list(expected.values())):
             print(f'{o}~{round(e)}')
 
-        statistics = chisquare(list(observed.values()),
-                               list(expected.values()))
+        return tuple(statistics)
+
+
+class PokerTestAccumulator:
+    """
+    Streaming Approximated Poker Test, for samples larger than memory
+
+    Chunks of the sample are pushed with update (or read from a file with update_file),
+    groups crossing chunk boundaries are completed with the last k - 1 numbers carried over.
+    Accumulators of consecutive shards of a sample can be filled in parallel processes 
+    and combined with merge, the result is the same as for one pass over the whole sample.
+
+    Parameters
+    ----------
+    k : Int
+        Length of the group
+    d : Int, default=10
+        Number of bins
+    chunk_size : Int, default=2**20
+        Number of groups counted at once
+
+    Example
+    ----------
+    >>> from approximated_poker_test import PokerTestAccumulator
+    >>> acc = PokerTestAccumulator(4, 10)
+    >>> for chunk in chunks:
+    ...     acc.update(chunk)
+    >>> acc.update_file('sample.npy')
+    >>> acc.result()
+    (3.674834656084651, 0.29878447375220785)
+
+    >>> shards = pool.map(count_shard, paths)  # PokerTestAccumulator of every shard, in order
+    >>> reduce(PokerTestAccumulator.merge, shards).result()
+    """
+
+    def __init__(self, k, d=10, chunk_size=2**20):
+        self.k = k
+        self.d = d
+        self.chunk_size = chunk_size
+
+        # counts of the complete groups, number of samples, first and last k - 1 samples
+        self.counts = np.zeros(k + 1, dtype=np.int64)
+        self.n = 0
+        self.head = np.empty(0)
+        self.tail = np.empty(0)
+
+    def merge(self, other):
+        """
+        Append the counts of the shard that follows this one in the sample (in place)
+
+        Returns
+        -------
+        self : PokerTestAccumulator
+        """
+        if (other.k, other.d) != (self.k, self.d):
+            raise ValueError("Accumulators of different k or d can not be merged")
+
+        # groups starting in the tail of this shard and ending in the head of the other
+        seam = np.concatenate([self.tail, other.head])
+        self.counts += other.counts + count_full_groups(seam, self.k, self.d)
+
+        edge = self.k - 1
+        self.head = np.concatenate([self.head, other.head])[:edge]
+        tail = np.concatenate([self.tail, other.tail])
+        self.tail = tail[len(tail) - min(len(tail), edge):]
+        self.n += other.n
+
+        return self
+
+    def update(self, chunk):
+        """
+        Push the next chunk of the sample
+
+        Parameters
+        ----------
+        chunk : array_like
+            Random numbers in [0,1] (np.memmap is read chunk_size numbers at a time)
+
+        Returns
+        -------
+        self : PokerTestAccumulator
+        """
+        chunk = np.asarray(chunk).ravel()
+        edge = min(len(chunk), self.k - 1)
+
+        shard = PokerTestAccumulator(self.k, self.d, self.chunk_size)
+        shard.counts = count_full_groups(chunk, self.k, self.d, self.chunk_size)
+        shard.n = len(chunk)
+        shard.head = np.asarray(chunk[:edge], dtype=float)
+        shard.tail = np.asarray(chunk[len(chunk) - edge:], dtype=float)
+
+        return self.merge(shard)
+
+    def update_file(self, path, dtype=np.float64):
+        """
+        Push the numbers stored in a .npy file or in a raw binary file of dtype, 
+        the file is memory-mapped and read chunk_size numbers at a time
+        """
+        if str(path).endswith('.npy'):
+            X = np.load(path, mmap_mode='r')
+        else:
+            X = np.memmap(path, dtype=dtype, mode='r')
+
+        return self.update(X)
+
+    def result(self):
+        """
+        Chi2 test of all the numbers pushed so far
+
+        Returns
+        -------
+        statistics : Tuple(float, float)
+            Chi2 statistic and p-value
+        """
+        test = ApproximatedPokerTest(self.k, self.d, self.chunk_size)
+        test.kseq_cnt = {r: int(self.counts[r]) for r in range(1, self.k + 1)}
+        test._count_short_groups(self.tail)
+        self.kseq_cnt = test.kseq_cnt
+
+        expected, observed, statistics = test._chisquare(self.n)
 
         return tuple(statistics)
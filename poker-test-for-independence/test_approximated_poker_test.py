@@ -0,0 +1,49 @@
+from functools import reduce
+
+import numpy as np
+
+from approximated_poker_test import ApproximatedPokerTest, PokerTestAccumulator
+
+
+def _reference_counts(X, k, d):
+    # counting loop of the original implementation, short groups at the tail included
+    kseq_cnt = {r: 0 for r in range(1, k + 1)}
+    for i in range(0, len(X)):
+        kseq = [int(f * d) for f in X[i:i + k]]
+        kseq_cnt[len(set(kseq))] += 1
+
+    return kseq_cnt
+
+
+def _sample(n, seed=0):
+    X = np.random.default_rng(seed).random(n)
+    X[::97] = 1.0
+    return X
+
+
+def test_counts_match_reference():
+    for n in (0, 1, 2, 3, 6, 1000, 5003):
+        X = _sample(n)
+        for k, d in ((4, 10), (5, 10), (3, 4), (2, 2), (7, 3)):
+            pt = ApproximatedPokerTest(k, d, chunk_size=64)
+            pt._count_all_k_series(X)
+            assert pt.kseq_cnt == _reference_counts(X, k, d)
+
+
+def test_accumulator_split_and_merge_match_one_pass():
+    X = _sample(5003)
+    for k, d in ((4, 10), (5, 10), (3, 4)):
+        expected = _reference_counts(X, k, d)
+        for splits in ([], [1], [2, 3, 4], [100, 101, 2500], list(range(0, 5003, 7))):
+            chunks = np.split(X, splits)
+
+            acc = PokerTestAccumulator(k, d, chunk_size=64)
+            for chunk in chunks:
+                acc.update(chunk)
+            acc.result()
+            assert acc.kseq_cnt == expected
+
+            shards = [PokerTestAccumulator(k, d, chunk_size=64).update(chunk) for chunk in chunks]
+            merged = reduce(PokerTestAccumulator.merge, shards)
+            np.testing.assert_allclose(merged.result(), acc.result())
+            assert merged.kseq_cnt == expected
@@ -19,12 +19,14 @@ class RandomByApproximation:
     >>> from random_by_approximation import RandomByApproximation
     >>> rba = RandomByApproximation(12, 4, 8)
     >>> rba.sample(10)
-    [-2.55521977, 16.08215166, 10.91286278,  6.54760184,  4.04907002,
-    -4.30730402,  8.62185616,  2.74680966, -2.47990582,  2.60756277]
+    array([-2.55521977, 16.08215166, 10.91286278,  6.54760184,  4.04907002,
+    -4.30730402,  8.62185616,  2.74680966, -2.47990582,  2.60756277])
     >>> X = rba.sample(10000)
     >>> np.mean(X);np.std(X)
     3.940207232096505
     7.952339326215744
+    >>> buffer = np.empty(10**6, dtype=np.float32)
+    >>> rba.sample(out=buffer, rng=np.random.default_rng(0))  # refills buffer in chunks
 
     References
     ----------
@@ -52,18 +54,59 @@ class RandomByApproximation:
 
         return x
 
-    def sample(self, size):
+    def sample(self, size=None, out=None, dtype=float, rng=None, chunk_size=None):
         """
         Draw samples from the distribution X
 
+        Sums of k uniforms are computed for chunks of samples at once, 
+        from a (chunk, k) block of U reused across chunks, so memory does not grow with size.
+
         Parameters
         ----------
-        size : Int
-            N of samples
+        size : Int or Tuple[Int], optional
+            N of samples (shape of the output), defaults to the shape of out
+        out : np.ndarray, optional
+            Buffer filled in place and returned
+        dtype : np.dtype, default=float
+            Type of the output (np.float32 or np.float64) if out is not given
+        rng : np.random.Generator, optional
+            Source of U, the global np.random state by default
+        chunk_size : Int, optional
+            N of samples per chunk, by default the block of U has at most 2^20 elements
+
         Returns
         -------
-        X : List[Float]
+        X : np.ndarray
             The returned samples
         """
-        X = [self._get_approximation() for _ in range(size)]
-        return X
+        if out is None:
+            if size is None:
+                raise ValueError("Either size or out must be given")
+            out = np.empty(size, dtype)
+        elif size is not None and out.shape != tuple(np.atleast_1d(size)):
+            raise ValueError("size does not match the shape of out")
+
+        # X = std * (Z - k/2) / sqrt(k/12) + mean = scale * Z + shift
+        scale = self.std / ((self.k / 12)**0.5)
+        shift = self.mean - scale * self.k / 2
+
+        X = out.reshape(-1)
+        chunk_size = chunk_size or max(1, 2**20 // self.k)
+        block = np.empty((min(chunk_size, X.size), self.k), out.dtype)
+
+        for start in range(0, X.size, chunk_size):
+            U = block[:min(chunk_size, X.size - start)]
+            if isinstance(rng, np.random.Generator):
+                rng.random(out=U, dtype=U.dtype)
+            else:
+                U[...] = np.random.uniform(size=U.shape)
+
+            chunk = X[start:start + len(U)]
+            np.sum(U, axis=1, out=chunk)
+            chunk *= scale
+            chunk += shift
+
+        if not np.shares_memory(X, out):
+            out[...] = X.reshape(out.shape)
+
+        return out
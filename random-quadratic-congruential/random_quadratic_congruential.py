@@ -1,3 +1,15 @@
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def _sample_block(generator, n):
+    # worker of RandomQuadraticCongruential.sample_parallel: n values starting at generator.y0
+    return generator.sample(n - 1)
+
+
 class RandomQuadraticCongruential:
     """
     Quadratic congruent random number generator
@@ -21,7 +33,9 @@ class RandomQuadraticCongruential:
     ----------
     >>> from random_quadratic_congruential import RandomQuadraticCongruential
     >>> RandomQuadraticCongruential(512, 1024).sample(10)
-    [0.5, 0.4990234375, 0.494140625, 0.4111328125, 0.05859375, 0.1435546875, 0.224609375, 0.3525390625, 0.5234375, 0.4443359375, 0.986328125]
+    array([0.5       , 0.49902344, 0.49414062, 0.41113281, 0.05859375,
+           0.14355469, 0.22460938, 0.35253906, 0.5234375 , 0.44433594,
+           0.98632812])
 
     Note
     ----------
@@ -35,9 +49,38 @@ class RandomQuadraticCongruential:
 
     If m is a multiple of 9, either a mod 9 = 0, or a mod 9 = 1 and ac mod 9 = 6
 
+    Parallel streams
+    ----------
+    Unlike the linear generator, the quadratic recurrence has no closed-form skip-ahead,
+    the start of every block is found by stepping the bare recurrence (checkpoint, jump), 
+    once the tail and the cycle length are known (period, Brent's algorithm) 
+    offsets are reduced modulo the cycle. 
+    substreams hands out non-overlapping consecutive blocks of the sequence,
+    sample_parallel generates them in a process pool, the result equals sample(size).
+
+    Finding the block starts is itself a serial pass over the sequence, about as costly as sample(size),
+    so a single call of sample_parallel is slower than sample. The block starts are kept (checkpoint)
+    and reused by later calls with the same block layout, only those calls (or offsets reduced
+    modulo a known period) gain from the pool.
+
+    >>> qcg = RandomQuadraticCongruential(512, 2**20)
+    >>> qcg.period()
+    (0, 1048576)
+    >>> np.array_equal(qcg.sample_parallel(10**7, n_workers=8), qcg.sample(10**7))
+    True
+
+    Power-of-two modulus
+    ----------
+    If m = 2^q (q <= 64) sample reduces with a bit mask instead of the modulo and converts to floats with NumPy,
+    it is still one Python integer step per value. 
+    For throughput sample_lanes advances many seeds in lockstep as a uint64 NumPy array 
+    (wrap-around arithmetic is exact mod 2^q), one array operation per step for all lanes.
+    stream yields consecutive chunks of the sequence into one reused buffer.
+
     References
     ----------
     1. Linear congruential generator en.wikipedia.org. Available at: https://en.wikipedia.org/wiki/Linear_congruential_generator.
+    2. Brent, R. P. (1980). An improved Monte Carlo factorization algorithm. BIT Numerical Mathematics, 20(2), 176-184.
 
 
     """
@@ -55,29 +98,270 @@ class RandomQuadraticCongruential:
         self.b = b
         self.c = c
 
+        # (tail length, cycle length) and known states {index: y_index}, see period and checkpoint
+        self._period = None
+        self._checkpoints = {0: y0}
+
     def is_power_two(self, x):
         """
         Check if the number is a power of two
         """
         return x & x - 1 == 0
 
-    def sample(self, size):
+    def _advance(self, y, n):
         """
-        Draw samples
+        Apply the recurrence n times to y
+        """
+        a, b, c, m = self.a, self.b, self.c, self.m
+        for _ in range(n):
+            y = (a * y * y + b * y + c) % m
+        return y
+
+    def period(self):
+        """
+        Find the tail length mu and the cycle length lam of the sequence
+        with Brent's cycle detection, O(mu + lam) steps and O(1) memory
+
+        Returns
+        -------
+        mu, lam : Tuple(Int, Int)
+            y_(n + lam) = y_n for every n >= mu
+        """
+        if self._period is not None:
+            return self._period
+
+        # cycle length: power of two search
+        power = lam = 1
+        tortoise, hare = self.y0, self._advance(self.y0, 1)
+        while tortoise != hare:
+            if power == lam:
+                tortoise = hare
+                power *= 2
+                lam = 0
+            hare = self._advance(hare, 1)
+            lam += 1
+
+        # tail length: two pointers lam apart meet at the start of the cycle
+        mu = 0
+        tortoise, hare = self.y0, self._advance(self.y0, lam)
+        while tortoise != hare:
+            tortoise, hare = self._advance(tortoise, 1), self._advance(hare, 1)
+            mu += 1
+
+        self._period = (mu, lam)
+        return self._period
+
+    def checkpoint(self, stride, count):
+        """
+        Store the states y_0, y_stride, ... y_(count - 1)*stride,
+        each stepped from the closest stored state, so states already known cost nothing
+        and later jumps start from the closest stored state
+        """
+        for i in range(1, count):
+            self._checkpoints[i * stride] = self.jump(i * stride)
+
+    def jump(self, n):
+        """
+        State y_n of the sequence, 
+        reduced modulo the cycle if the period is known, stepped from the closest checkpoint
+        (only checkpoint stores states, so jumps do not grow memory)
+        """
+        if self._period is not None and n >= self._period[0]:
+            mu, lam = self._period
+            n = mu + (n - mu) % lam
+
+        start = max(i for i in self._checkpoints if i <= n)
+
+        return self._advance(self._checkpoints[start], n - start)
+
+    def substreams(self, n_streams, block_size):
+        """
+        Split the sequence into non-overlapping consecutive blocks
+
+        Returns
+        -------
+        streams : List[RandomQuadraticCongruential]
+            streams[i] starts at y_(i * block_size), 
+            streams[i].sample(block_size - 1) are the values of the i-th block
+        """
+        self.checkpoint(block_size, n_streams)
+
+        streams = []
+        for i in range(n_streams):
+            stream = copy.copy(self)
+            stream.y0 = self.jump(i * block_size)
+            stream._period, stream._checkpoints = None, {0: stream.y0}
+            streams.append(stream)
+
+        return streams
+
+    def sample_parallel(self, size, n_workers=None, block_size=None):
+        """
+        Draw samples in a process pool, the same values as sample(size)
 
         Parameters
         ----------
         size : Int
             N of samples
+        n_workers : Int, optional
+            Size of the pool, the number of CPUs by default
+        block_size : Int, optional
+            Values per block, by default the sequence is split into 4 blocks per worker
 
         Returns
         -------
-        Y : List[Float]
+        Y : np.ndarray
             The returned samples Y[y0...yn]
         """
+        n_workers = n_workers or os.cpu_count()
+        block_size = block_size or -(-(size + 1) // (4 * n_workers))
+        n_blocks = -(-(size + 1) // block_size)
+
+        streams = self.substreams(n_blocks, block_size)
+        sizes = [block_size] * (n_blocks - 1) + [size + 1 - block_size * (n_blocks - 1)]
+
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            Y = np.concatenate(list(ex.map(_sample_block, streams, sizes)))
+
+        return Y
+
+    def _is_power_two_modulus(self):
+        return self.is_power_two(self.m) and self.m <= 2**64
+
+    def _iterate(self, y, n):
+        """
+        Yield the n states following y (Python integers), masked instead of reduced modulo m when m = 2^q
+        """
+        a, b, c, m = self.a, self.b, self.c, self.m
+        if self._is_power_two_modulus():
+            mask = m - 1
+            for _ in range(n):
+                y = (a * y * y + b * y + c) & mask
+                yield y
+        else:
+            for _ in range(n):
+                y = (a * y * y + b * y + c) % m
+                yield y
+
+    def _sample_reference(self, size):
+        """
+        Reference implementation for arbitrary m
+        """
         Y = [self.y0]
         for _ in range(size):
             Y.append((self.a * Y[-1]**2 + self.b * Y[-1] + self.c) % self.m)
 
         # y = y/m, y ∈ [0, m)
         return [y / self.m for y in Y]
+
+    def _fill(self, y, out):
+        """
+        Write y / m followed by the next len(out) - 1 values into out, returns the last state
+        """
+        if self._is_power_two_modulus():
+            Y = np.fromiter(self._iterate(y, len(out) - 1), dtype=np.uint64, count=len(out) - 1)
+            out[0] = y / self.m
+            # m = 2^q: dividing by m is exact
+            np.multiply(Y, 1 / self.m, out=out[1:])
+            return int(Y[-1]) if len(Y) else y
+
+        Y = [y] + list(self._iterate(y, len(out) - 1))
+        out[:] = [v / self.m for v in Y]
+        return Y[-1]
+
+    def sample(self, size, out=None):
+        """
+        Draw samples
+
+        Parameters
+        ----------
+        size : Int
+            N of samples
+        out : np.ndarray, optional
+            Buffer of size + 1 floats filled in place and returned
+
+        Returns
+        -------
+        Y : np.ndarray
+            The returned samples Y[y0...yn]
+        """
+        if out is None:
+            out = np.empty(size + 1)
+        elif len(out) != size + 1:
+            raise ValueError("out should hold size + 1 values")
+
+        if not self._is_power_two_modulus():
+            out[:] = self._sample_reference(size)
+            return out
+
+        self._fill(self.y0, out)
+        return out
+
+    def stream(self, chunk_size=2**16, out=None):
+        """
+        Endless generator of consecutive chunks of the sequence Y[y0, y1, ...], 
+        every chunk is written into the same buffer (copy it to keep it)
+
+        Parameters
+        ----------
+        chunk_size : Int, default=2**16
+            N of samples per chunk
+        out : np.ndarray, optional
+            Buffer of floats reused for every chunk (its length sets the chunk size)
+
+        Yields
+        ------
+        Y : np.ndarray
+            The next chunk of samples
+        """
+        out = np.empty(chunk_size) if out is None else out
+
+        y = self._fill(self.y0, out)
+        yield out
+        while True:
+            y = self._fill(self._advance(y, 1), out)
+            yield out
+
+    def sample_lanes(self, seeds, size, out=None):
+        """
+        Advance many sequences (one per seed) in lockstep, 
+        every step is one uint64 array operation over all lanes (m = 2^q only)
+
+        Parameters
+        ----------
+        seeds : array_like
+            First elements y0 of the sequences
+        size : Int
+            N of samples per sequence
+        out : np.ndarray, optional
+            Buffer of shape (size + 1, n_lanes) filled in place and returned
+
+        Returns
+        -------
+        Y : np.ndarray
+            Array of shape (size + 1, n_lanes), column j is the sequence started at seeds[j]
+        """
+        if not self._is_power_two_modulus():
+            raise ValueError("sample_lanes needs m = 2^q with q <= 64")
+
+        y = np.asarray(seeds, dtype=np.uint64).copy()
+        if out is None:
+            out = np.empty((size + 1, len(y)))
+
+        # coefficients may exceed 2^64, only their residues mod m matter
+        a, b, c = (np.uint64(coefficient % self.m) for coefficient in (self.a, self.b, self.c))
+        mask = np.uint64(self.m - 1)
+        t = np.empty_like(y)
+        scale = 1 / self.m
+
+        out[0] = y * scale
+        for i in range(1, size + 1):
+            # y = (a * y + b) * y + c  (mod 2^64), then mod m
+            np.multiply(y, a, out=t)
+            t += b
+            t *= y
+            t += c
+            np.bitwise_and(t, mask, out=y)
+            np.multiply(y, scale, out=out[i])
+
+        return out
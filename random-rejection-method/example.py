@@ -33,4 +33,12 @@ rbj = RandomByRejection(f, pdf, max_pdf)
 X = rbj.sample(10000)
 
 plt.hist(X)
-plt.show()
\ No newline at end of file
+plt.show()
+
+# squeeze: cheap lower bound of the triangular pdf, accepted candidates under it skip the pdf call
+squeeze = lambda x: max_pdf * max(0, 1 - abs(x - mode) / (mode - minimum))
+
+rbj = RandomByRejection(f, pdf, max_pdf, squeeze=squeeze)
+X = rbj.sample(10000)
+
+print(f'acceptance rate = {rbj.acceptance_rate}, pdf calls per candidate = {rbj.n_pdf_calls / rbj.n_candidates}')
@@ -10,10 +10,31 @@ class RandomByRejection:
     ----------
     f : Func(x)->y
         Function that returns a random number (f() belongs to X) from U
+        (or from the proposal distribution if proposal_pdf is given)
     pdf : Func(x)->p
         Probability density function of X
     max_pdf: Float
         Maximum of a given probability density function, aka the "height" of the distribution
+        (flat envelope, ignored if proposal_pdf is given)
+    vectorized: Bool, default=False
+        If True, f(n) returns an array of n candidates and pdf takes and returns arrays,
+        candidates are then drawn in blocks sized from the observed acceptance rate
+    max_block: Int, default=2**20
+        Largest block of candidates drawn at once (bounds the memory of the vectorized mode)
+    proposal_pdf: Func(x)->p, optional
+        Density g of the candidates returned by f, the envelope is then M * g(x) >= pdf(x)
+        (a proposal close to pdf keeps the acceptance rate 1 / M high for peaked densities)
+    M: Float, optional
+        Scaling constant of the proposal density
+    squeeze: Func(x)->p, optional
+        Cheap lower bound of pdf, candidates under the squeeze are accepted without evaluating pdf
+
+    Attributes
+    ----------
+    acceptance_rate: Float
+        Fraction of accepted candidates
+    n_pdf_calls: Int
+        Number of points at which pdf was evaluated
 
     Example
     ----------
@@ -23,16 +44,90 @@ class RandomByRejection:
     [5.960490859234767, 4.749522023202175, 3.146933717716522, 
     6.192637916602297, 8.44873270536448, 3.7206028389123578, 
     4.945114547015546, 3.040876425727124, 4.524948973535853, 5.37190297767069]
+    >>> rbj = RandomByRejection(lambda n: np.random.uniform(1, 10, n), np.vectorize(pdf), max_pdf, vectorized=True)
+    >>> rbj.sample(10**7)
+    array([5.52049853, 4.04380598, 6.22658066, ..., 3.36214435, 6.90005391, 4.62163187])
+    >>> rbj = RandomByRejection(f, pdf, proposal_pdf=g, M=1.2, squeeze=s)
+    >>> rbj.sample(10000); rbj.acceptance_rate, rbj.n_pdf_calls
 
     References
     ----------
     1. Rejection sampling wikipedia. Available at: https://en.wikipedia.org/wiki/Rejection_sampling
+    2. Gilks, W. R., & Wild, P. (1992). Adaptive rejection sampling for Gibbs sampling. 
+    Journal of the Royal Statistical Society: Series C (Applied Statistics), 41(2), 337-348.
     """
 
-    def __init__(self, f, pdf, max_pdf):
+    def __init__(self, f, pdf, max_pdf=None, vectorized=False, max_block=2**20,
+                 proposal_pdf=None, M=None, squeeze=None):
+        if proposal_pdf is None and max_pdf is None:
+            raise ValueError("Either max_pdf or proposal_pdf and M should be given")
+        if proposal_pdf is not None and M is None:
+            raise ValueError("M should be given with proposal_pdf")
+
         self.f = f
         self.pdf = pdf
         self.max_pdf = max_pdf
+        self.vectorized = vectorized
+        self.max_block = max_block
+        self.proposal_pdf = proposal_pdf
+        self.M = M
+        self.squeeze = squeeze
+
+        # totals over all calls, the acceptance rate sizes the blocks of the vectorized mode
+        self.n_candidates = 0
+        self.n_accepted = 0
+        self.n_pdf_calls = 0
+
+    @property
+    def acceptance_rate(self):
+        """
+        Observed fraction of accepted candidates
+        """
+        return self.n_accepted / self.n_candidates if self.n_candidates else None
+
+    def _envelope(self, x):
+        """
+        Upper bound of pdf at x
+        """
+        if self.proposal_pdf is None:
+            return self.max_pdf if np.ndim(x) == 0 else np.full(len(x), self.max_pdf)
+
+        return self.M * self.proposal_pdf(x)
+
+    def _block_size(self, remaining):
+        """
+        Number of candidates expected to yield the remaining samples, with a small margin
+        """
+        rate = self.acceptance_rate or 1
+        block = int(remaining / max(rate, 1e-6) * 1.05) + 16
+
+        return min(block, self.max_block)
+
+    def _sample_vectorized(self, size):
+        X = np.empty(size)
+
+        filled = 0
+        while filled < size:
+            x = np.asarray(self.f(self._block_size(size - filled)), dtype=float)
+            u = np.random.uniform(0, 1, size=len(x)) * self._envelope(x)
+
+            if self.squeeze is None:
+                keep = u < self.pdf(x)
+                self.n_pdf_calls += len(x)
+            else:
+                keep = u < self.squeeze(x)
+                undecided = np.flatnonzero(~keep)
+                keep[undecided] = u[undecided] < self.pdf(x[undecided])
+                self.n_pdf_calls += len(undecided)
+
+            accepted = x[keep][:size - filled]
+            X[filled:filled + len(accepted)] = accepted
+            filled += len(accepted)
+
+            self.n_candidates += len(x)
+            self.n_accepted += np.count_nonzero(keep)
+
+        return X
 
     def sample(self, size):
         """
@@ -44,18 +139,29 @@ class RandomByRejection:
             N of samples
         Returns
         -------
-        X : List[Float]
-            The returned samples
+        X : List[Float] or np.ndarray
+            The returned samples (np.ndarray in the vectorized mode)
         """
+        if self.vectorized:
+            return self._sample_vectorized(size)
+
         X = []
 
         while len(X) < size:
 
             x = self.f()
-            y = self.pdf(x)
-            u = np.random.uniform(0, self.max_pdf)
+            u = np.random.uniform(0, self._envelope(x))
 
+            self.n_candidates += 1
+            if self.squeeze is not None and u < self.squeeze(x):
+                X.append(x)
+                continue
+
+            y = self.pdf(x)
+            self.n_pdf_calls += 1
             if u < y:
                 X.append(x)
 
+        self.n_accepted += len(X)
+
         return X
@@ -0,0 +1,159 @@
+import numpy as np
+
+
+class RandomByTable:
+    """
+    Random sampling from a distribution X given by its pdf on [minimum, maximum]
+    with a precomputed lookup table, every sample then costs O(1) vectorized array lookups.
+
+    Methods
+    ----------
+    'alias' - Walker alias table over the cells of a uniform grid, 
+    the density is constant within a cell.
+    'inverse_cdf' - the inverse CDF tabulated at equally spaced probabilities 
+    and linearly interpolated (piecewise-linear inverse CDF).
+
+    The table is built once, holds only NumPy arrays (no reference to pdf), 
+    so the sampler can be pickled or saved with save() and restored with load().
+
+    Approximation error: ks_error is the Kolmogorov distance sup|F_table(x) - F(x)| 
+    between the distribution sampled from the table and X, 
+    F being the trapezoid-rule CDF of pdf on a grid 8 times finer than the table. 
+    For a smooth pdf it decreases as O(1/n_table^2) with 'alias', 
+    'inverse_cdf' converges slower where the pdf goes to 0 (the inverse CDF is steep there).
+
+    Parameters
+    ----------
+    pdf : Func(x)->p
+        Probability density function of X (unnormalized pdf is fine)
+    minimum : Float
+        Lower bound of the support
+    maximum : Float
+        Upper bound of the support
+    n_table: Int, default=4096
+        Size of the table
+    method: Str, default='alias'
+        'alias' or 'inverse_cdf'
+    vectorized: Bool, default=False
+        If True, pdf takes and returns arrays
+
+    Example
+    ----------
+    >>> from random_by_table import RandomByTable
+    >>> rbt = RandomByTable(pdf, 1, 10)
+    >>> rbt.ks_error
+    3.352761274166838e-08
+    >>> rbt.sample(10**7)
+    array([6.19420519, 2.73468478, 5.13213357, ..., 5.60127281, 4.12808357, 3.0983127 ])
+    >>> rbt.save('triangular.npz')
+    >>> RandomByTable.load('triangular.npz').sample(10)
+
+    References
+    ----------
+    1. Walker, A. J. (1977). An efficient method for generating discrete random variables with general distributions. 
+    ACM Transactions on Mathematical Software, 3(3), 253-256.
+    2. Vose, M. D. (1991). A linear algorithm for generating random numbers with a given distribution. 
+    IEEE Transactions on software engineering, 17(9), 972-975.
+    """
+
+    def __init__(self, pdf, minimum, maximum, n_table=4096, method='alias', vectorized=False):
+        if method not in ('inverse_cdf', 'alias'):
+            raise ValueError(f"Unknown method: {method}")
+
+        self.minimum = minimum
+        self.maximum = maximum
+        self.method = method
+
+        pdf = pdf if vectorized else np.vectorize(pdf, otypes=[float])
+
+        # reference CDF on a finer grid, also used to measure the error of the table
+        xf = np.linspace(minimum, maximum, 8 * n_table + 1)
+        pf = np.clip(pdf(xf), 0, None)
+        cdf = np.concatenate([[0], np.cumsum((pf[1:] + pf[:-1]) / 2 * np.diff(xf))])
+        cdf /= cdf[-1]
+
+        if method == 'inverse_cdf':
+            self.table = np.interp(np.linspace(0, 1, n_table + 1), cdf, xf)
+            cdf_table = np.interp(xf, self.table, np.linspace(0, 1, n_table + 1))
+        else:
+            edges = xf[::8]
+            mass = np.diff(cdf[::8])
+            self.prob, self.alias = self._build_alias(mass)
+            cdf_table = np.interp(xf, edges, np.concatenate([[0], np.cumsum(mass)]))
+
+        self.ks_error = np.abs(cdf_table - cdf).max()
+
+    @staticmethod
+    def _build_alias(mass):
+        """
+        Vose's alias method: cell i is kept with probability prob[i], otherwise alias[i] is taken
+        """
+        n = len(mass)
+        prob = mass * n / mass.sum()
+        alias = np.arange(n)
+
+        small = [i for i in range(n) if prob[i] < 1]
+        large = [i for i in range(n) if prob[i] >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            alias[s] = l
+            prob[l] -= 1 - prob[s]
+            (small if prob[l] < 1 else large).append(l)
+
+        # leftovers are 1 up to rounding
+        prob[small + large] = 1
+
+        return prob, alias
+
+    def sample(self, size):
+        """
+        Draw samples from the distribution X
+
+        Parameters
+        ----------
+        size : Int
+            N of samples
+        Returns
+        -------
+        X : np.ndarray
+            The returned samples
+        """
+        if self.method == 'inverse_cdf':
+            n = len(self.table) - 1
+            position = np.random.uniform(size=size) * n
+            i = np.minimum(position.astype(np.int64), n - 1)
+            t = position - i
+            return (1 - t) * self.table[i] + t * self.table[i + 1]
+
+        n = len(self.prob)
+        position = np.random.uniform(size=size) * n
+        i = np.minimum(position.astype(np.int64), n - 1)
+        cell = np.where(np.random.uniform(size=size) < self.prob[i], i, self.alias[i])
+        # position - i is uniform in [0, 1) and independent of the chosen cell
+        return self.minimum + (cell + position - i) * (self.maximum - self.minimum) / n
+
+    def save(self, path):
+        """
+        Save the table to a .npz file
+        """
+        arrays = {'table': self.table} if self.method == 'inverse_cdf' else {'prob': self.prob, 'alias': self.alias}
+        np.savez(path, method=self.method, minimum=self.minimum, maximum=self.maximum,
+                 ks_error=self.ks_error, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Restore a sampler saved with save()
+        """
+        data = np.load(path)
+        sampler = cls.__new__(cls)
+        sampler.method = str(data['method'])
+        sampler.minimum = float(data['minimum'])
+        sampler.maximum = float(data['maximum'])
+        sampler.ks_error = float(data['ks_error'])
+        if sampler.method == 'inverse_cdf':
+            sampler.table = data['table']
+        else:
+            sampler.prob, sampler.alias = data['prob'], data['alias']
+
+        return sampler
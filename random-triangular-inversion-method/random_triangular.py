@@ -11,19 +11,26 @@ class RandomTriangular:
 
     Parameters
     ----------
-    minimum : Float
+    minimum : Float or array_like
         [a]
-    mode : Float
+    mode : Float or array_like
         [b]
-    maximum: Float
+    maximum: Float or array_like
         [c]
+        Array-valued parameters (broadcast together) define 
+        many triangular distributions sampled in one call
 
     Example
     ----------
     >>> from random_triangular import RandomTriangular
     >>> tgen = RandomTriangular(1, 3, 5)
     >>> tgen.sample(10)
-    [4.227567842367436, 3.8061169676232325, 3.4928648056119225, 2.6752992502923743, 3.1115694877383087, 3.5471438298532902, 3.4052578778856324, 2.4027460384076607, 3.3043270228447694, 1.2173025061137515]
+    array([4.22756784, 3.80611697, 3.49286481, 2.67529925, 3.11156949, 3.54714383, 3.40525788, 2.40274604, 3.30432702, 1.21730251])
+    >>> rng = np.random.default_rng(0)
+    >>> buffer = np.empty(10**6)
+    >>> for _ in range(100):
+    ...     tgen.sample(out=buffer, rng=rng)  # refills buffer, no allocation
+    >>> RandomTriangular([0, 1], [1, 3], [2, 5]).sample((1000, 2))  # column j ~ T(a[j], b[j], c[j])
 
     References
     ----------
@@ -39,39 +46,83 @@ class RandomTriangular:
         self.b = mode
         self.c = maximum
 
-    def _inverse_triangular_cdf(self, xu, a, b, c):
+        # CDF at the mode and the scales of both branches of the inverse CDF
+        a, b, c = np.asarray(minimum), np.asarray(mode), np.asarray(maximum)
+        self._fc = (b - a) / (c - a)
+        self._left = (c - a) * (b - a)
+        self._right = (c - a) * (c - b)
+        self._scratch = None
+
+    def _inverse_triangular_cdf(self, xu, out=None, scratch=None):
         """
-        Given random number [0,1] xu (from U),
-        as well as the minimum of a, mode b, and maximum of c,
-        returns the value of the random variable X
+        Given random numbers [0,1] xu (from U),
+        returns the values of the random variable X, written to out (which may be xu itself).
+        scratch - float and bool buffers of the shape of out, allocated if not given
         """
-        # from zero to mode
-        if 0 <= xu and xu < ((b - a) / (c - a)):
-            return a + ((c - a) * (b - a) * xu)**0.5
+        xu = np.asarray(xu)
+        if out is None:
+            out = np.empty(np.broadcast_shapes(xu.shape, self._fc.shape), np.result_type(xu, float))
+        left, is_left = scratch if scratch is not None else (np.empty(out.shape, out.dtype),
+                                                             np.empty(out.shape, bool))
+
+        # from zero to mode, a + sqrt((c - a)(b - a)U)
+        np.less(xu, self._fc, out=is_left)
+        np.multiply(xu, self._left, out=left)
+        np.sqrt(left, out=left)
+        np.add(left, self.a, out=left)
+
+        # from mode to 1, c - sqrt((c - a)(c - b)(1 - U)), computed in out
+        np.subtract(1, xu, out=out)
+        np.multiply(out, self._right, out=out)
+        np.sqrt(out, out=out)
+        np.subtract(self.c, out, out=out)
+
+        np.copyto(out, left, where=is_left)
 
-        # from mode to 1
-        elif ((b - a) / (c - a)) <= xu and xu <= 1:
-            return c - ((c - a) * (c - b) * (1 - xu))**0.5
+        return out
 
-    def sample(self, size):
+    def _get_scratch(self, shape, dtype):
+        """
+        One pair of temporary buffers kept for refilling out buffers of the same shape and dtype
+        """
+        if self._scratch is None or self._scratch[0].shape != shape or self._scratch[0].dtype != dtype:
+            self._scratch = np.empty(shape, dtype), np.empty(shape, bool)
+        return self._scratch
+
+    def sample(self, size=None, out=None, rng=None):
         """
         Draw samples from the triangular distribution
 
         Parameters
         ----------
-        size : Int
-            N of samples
+        size : Int or Tuple[Int], optional
+            N of samples (shape of the output), 
+            defaults to the broadcast shape of the parameters or to the shape of out
+        out : np.ndarray, optional
+            Buffer of floats filled in place and returned
+            (the last out shape keeps one pair of temporary buffers, so refills allocate nothing)
+        rng : np.random.Generator, optional
+            Source of U, the global np.random state by default
+            (only a Generator fills out without allocating)
 
         Returns
         -------
-        X : List[Float]
+        X : np.ndarray
             The returned samples
         """
-
-        self.size = size
+        shape = () if size is None else tuple(np.atleast_1d(size))
+        scratch = None
+        if out is None:
+            out = np.empty(np.broadcast_shapes(self._fc.shape, shape))
+        elif size is not None and out.shape != shape:
+            raise ValueError("size does not match the shape of out")
+        else:
+            scratch = self._get_scratch(out.shape, out.dtype)
 
         # random numbers [0,1]
-        U = np.random.uniform(low=0, high=1, size=self.size)
-        X = [self._inverse_triangular_cdf(x, self.a, self.b, self.c) for x in U]
+        if isinstance(rng, np.random.Generator):
+            rng.random(out=out, dtype=out.dtype)
+        else:
+            out[...] = np.random.uniform(low=0, high=1, size=out.shape)
 
-        return X
+        return self._inverse_triangular_cdf(out, out, scratch)
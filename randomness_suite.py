@@ -0,0 +1,310 @@
+import os
+import sys
+import time
+from functools import partial
+
+import numpy as np
+from scipy.stats import chisquare, norm
+
+from freedman_diaconis import freedman_diaconis
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'poker-test-for-independence'))
+from approximated_poker_test import poker_probabilities  # noqa: E402
+
+
+class PokerTest:
+    """
+    Poker test on non-overlapping hands (x_kj, .., x_kj+k-1): counts of hands with r distinct bins of d
+    against the exact probabilities (poker_probabilities). Classes of r with fewer than 5 expected hands
+    are lumped into the next one.
+
+    The hands are independent, so the chi2 p-value holds, unlike for the overlapping groups
+    of ApproximatedPokerTest / PokerTestAccumulator (every position starts a group).
+    """
+
+    def __init__(self, k=5, d=10):
+        self.k = k
+        self.d = d
+        self.counts = np.zeros(k + 1, dtype=np.int64)
+        self._carry = np.empty(0)
+
+    def update(self, chunk):
+        chunk = np.concatenate([self._carry, chunk])
+        n = len(chunk) // self.k * self.k
+        self._carry = chunk[n:]
+
+        bins = np.minimum((chunk[:n] * self.d).astype(np.int64), self.d - 1)
+        hands = np.sort(bins.reshape(-1, self.k), axis=1)
+        distinct = 1 + np.count_nonzero(np.diff(hands, axis=1), axis=1)
+        self.counts += np.bincount(distinct, minlength=self.k + 1)
+        return self
+
+    def result(self):
+        observed = self.counts[1:]
+        expected = np.array([float(p) for p in poker_probabilities(self.k, self.d)]) * observed.sum()
+
+        # lump the rare classes from r = 1 up
+        first = 0
+        while first < len(expected) - 2 and expected[:first + 1].sum() < 5:
+            first += 1
+        observed = np.concatenate([[observed[:first + 1].sum()], observed[first + 1:]])
+        expected = np.concatenate([[expected[:first + 1].sum()], expected[first + 1:]])
+
+        # r > d is impossible, those classes have 0 expected and observed hands
+        possible = expected > 0
+        return tuple(chisquare(observed[possible], expected[possible]))
+
+
+class FrequencyTest:
+    """
+    Equidistribution test: counts of the numbers in d equal bins of [0,1] against the uniform counts
+    """
+
+    def __init__(self, d=10):
+        self.d = d
+        self.counts = np.zeros(d, dtype=np.int64)
+
+    def update(self, chunk):
+        bins = np.minimum((chunk * self.d).astype(np.int64), self.d - 1)
+        self.counts += np.bincount(bins, minlength=self.d)
+        return self
+
+    def result(self):
+        return tuple(chisquare(self.counts))
+
+
+class SerialTest:
+    """
+    Serial test: counts of the non-overlapping pairs (x_2j, x_2j+1) in d x d cells against the uniform counts
+    """
+
+    def __init__(self, d=8):
+        self.d = d
+        self.counts = np.zeros(d * d, dtype=np.int64)
+        self._carry = np.empty(0)
+
+    def update(self, chunk):
+        chunk = np.concatenate([self._carry, chunk])
+        n = len(chunk) // 2 * 2
+        self._carry = chunk[n:]
+
+        bins = np.minimum((chunk[:n] * self.d).astype(np.int64), self.d - 1)
+        self.counts += np.bincount(bins[0::2] * self.d + bins[1::2], minlength=self.d * self.d)
+        return self
+
+    def result(self):
+        return tuple(chisquare(self.counts))
+
+
+class RunsTest:
+    """
+    Wald-Wolfowitz runs test: number of runs above and below 1/2, normal approximation (two-sided)
+    """
+
+    def __init__(self):
+        self.n_above = 0
+        self.n = 0
+        self.runs = 0
+        self._last = None
+
+    def update(self, chunk):
+        if not len(chunk):
+            return self
+        above = chunk >= 0.5
+        self.runs += np.count_nonzero(above[1:] != above[:-1]) + (self._last is None or above[0] != self._last)
+        self._last = above[-1]
+        self.n_above += np.count_nonzero(above)
+        self.n += len(chunk)
+        return self
+
+    def result(self):
+        n1, n2, n = self.n_above, self.n - self.n_above, self.n
+        mean = 2 * n1 * n2 / n + 1
+        var = (mean - 1) * (mean - 2) / (n - 1)
+        z = (self.runs - mean) / var**0.5
+        return z, 2 * norm.sf(abs(z))
+
+
+class GapTest:
+    """
+    Gap test: lengths of the gaps between numbers falling in [alpha, beta),
+    gaps of length 0..t-1 and >= t against the geometric probabilities p(1-p)^r
+    """
+
+    def __init__(self, alpha=0, beta=0.5, t=10):
+        self.alpha = alpha
+        self.beta = beta
+        self.t = t
+        self.counts = np.zeros(t + 1, dtype=np.int64)
+        self._run = 0
+
+    def update(self, chunk):
+        hits = np.flatnonzero((self.alpha <= chunk) & (chunk < self.beta))
+        if not len(hits):
+            self._run += len(chunk)
+            return self
+
+        gaps = np.diff(hits, prepend=-1 - self._run) - 1
+        self.counts += np.bincount(np.minimum(gaps, self.t), minlength=self.t + 1)
+        self._run = len(chunk) - hits[-1] - 1
+        return self
+
+    def result(self):
+        p = self.beta - self.alpha
+        probabilities = p * (1 - p)**np.arange(self.t + 1)
+        probabilities[-1] = (1 - p)**self.t
+        return tuple(chisquare(self.counts, probabilities * self.counts.sum()))
+
+
+class HistogramTest:
+    """
+    Chi2 test of the histogram of the numbers on [0,1],
+    the number of bins is set by the Freedman–Diaconis rule on the first chunk
+    """
+
+    def __init__(self):
+        self.counts = None
+
+    def update(self, chunk):
+        if self.counts is None:
+            self.n_bins = max(freedman_diaconis(chunk), 2)
+            self.counts = np.zeros(self.n_bins, dtype=np.int64)
+
+        self.counts += np.histogram(chunk, bins=self.n_bins, range=(0, 1))[0]
+        return self
+
+    def result(self):
+        return tuple(chisquare(self.counts))
+
+
+def default_battery():
+    """
+    Poker test (non-overlapping hands) for several (k, d), frequency, serial, runs, gap and histogram tests
+    """
+    return {
+        'poker(k=4, d=10)': partial(PokerTest, 4, 10),
+        'poker(k=5, d=10)': partial(PokerTest, 5, 10),
+        'poker(k=3, d=4)': partial(PokerTest, 3, 4),
+        'frequency(d=10)': partial(FrequencyTest, 10),
+        'serial(d=8)': partial(SerialTest, 8),
+        'runs': RunsTest,
+        'gap([0, 0.5), t=10)': partial(GapTest, 0, 0.5, 10),
+        'histogram(FD)': HistogramTest,
+    }
+
+
+class RandomnessSuite:
+    """
+    Battery of randomness tests fed from a single pass over the output of a generator
+
+    Every chunk of numbers is read once and pushed to all tests (update),
+    so the cost of generating and reading the sample is paid once per generator, not once per test.
+
+    Parameters
+    ----------
+    tests : Dict[Str, Func()->test], optional
+        Factories of the tests (objects with update(chunk) and result() -> (statistic, p-value)),
+        default_battery() by default
+    chunk_size : Int, default=2**16
+        N of numbers read at once
+    alpha : Float, default=0.01
+        Significance level, a test fails if its p-value is below alpha
+
+    Example
+    ----------
+    >>> from randomness_suite import RandomnessSuite
+    >>> suite = RandomnessSuite()
+    >>> qcg = RandomQuadraticCongruential(512, 2**20)
+    >>> tgen = RandomTriangular(1, 3, 5)
+    >>> suite.run_all({
+    ...     'numpy': np.random.default_rng().random,
+    ...     'quadratic congruential': qcg.stream(),
+    ...     # non-uniform generators are mapped to U(0, 1) by their CDF
+    ...     'triangular': lambda n: stats.triang(0.5, 1, 4).cdf(tgen.sample(n)),
+    ... }, size=10**6)
+    numpy: 1000000 numbers, 2.12e+06 numbers/s
+        poker(k=4, d=10)        stat=1.6796      p=0.6415    pass
+        ...
+
+    References
+    ----------
+    1. Knuth, D. E. (1997). The Art of Computer Programming, Volume 2: Seminumerical Algorithms, 3.3.2 Empirical tests.
+    2. Wald, A., & Wolfowitz, J. (1940). On a test whether two samples are from the same population. 
+    The Annals of Mathematical Statistics, 11(2), 147-162.
+    """
+
+    def __init__(self, tests=None, chunk_size=2**16, alpha=0.01):
+        self.tests = tests or default_battery()
+        self.chunk_size = chunk_size
+        self.alpha = alpha
+
+    def _chunks(self, source, size):
+        """
+        Chunks of numbers from a callable source(n) -> n numbers or from an iterable of chunks
+        """
+        if callable(source):
+            for start in range(0, size, self.chunk_size):
+                yield np.asarray(source(min(self.chunk_size, size - start)), dtype=float)
+            return
+
+        left = size
+        for chunk in source:
+            chunk = np.asarray(chunk, dtype=float).ravel()[:left]
+            left -= len(chunk)
+            yield chunk
+            if not left:
+                return
+
+    def run(self, source, size):
+        """
+        Run all tests on size numbers of one generator
+
+        Parameters
+        ----------
+        source : Func(n)->array_like or Iterable[array_like]
+            Generator of numbers in [0,1]
+        size : Int
+            N of numbers tested
+
+        Returns
+        -------
+        report : Dict
+            n, seconds, throughput (numbers/s) and results: {test: (statistic, p-value, passed)}
+        """
+        tests = {name: factory() for name, factory in self.tests.items()}
+
+        n = 0
+        start = time.perf_counter()
+        for chunk in self._chunks(source, size):
+            for test in tests.values():
+                test.update(chunk)
+            n += len(chunk)
+        seconds = time.perf_counter() - start
+
+        results = {}
+        for name, test in tests.items():
+            statistic, p_value = test.result()
+            results[name] = (statistic, p_value, bool(p_value >= self.alpha))
+
+        return {'n': n, 'seconds': seconds, 'throughput': n / seconds if seconds else float('inf'),
+                'results': results}
+
+    def run_all(self, generators, size, verbose=True):
+        """
+        Run all tests on every generator of generators {name: source}, print a pass/fail report
+
+        Returns
+        -------
+        reports : Dict[Str, Dict]
+            Report of every generator (see run)
+        """
+        reports = {}
+        for name, source in generators.items():
+            reports[name] = report = self.run(source, size)
+
+            if verbose:
+                print(f"{name}: {report['n']} numbers, {report['throughput']:.3g} numbers/s")
+                for test, (statistic, p_value, passed) in report['results'].items():
+                    print(f"    {test:<24}stat={statistic:<12.5g}p={p_value:<10.4g}{'pass' if passed else 'FAIL'}")
+
+        return reports
@@ -1,17 +1,256 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
-from scipy import linalg
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import linalg, signal
+from scipy.sparse.linalg import LinearOperator, svds
+
+
+SVD_BACKENDS = ('auto', 'full', 'eigh', 'arpack', 'randomized')
+
+
+def trajectory_view(data, window_length, num_windows, step=1):
+    """
+    Rows of the trajectory matrix (its used columns, transposed) as a strided view over data.
+    No copy is made, row j of the view is data[j * step: j * step + window_length].
+
+    Parameters
+    ----------
+    data : array_like
+        Time series
+    window_length : Int
+        L, length of the lagged vectors
+    num_windows : Int
+        K, number of columns of the trajectory matrix
+    step : Int, default=1
+        Only every step-th column of the trajectory matrix is filled
+
+    Returns
+    -------
+    view : np.ndarray
+        Read-only (ceil(K / step), L) view
+    """
+    data = np.asarray(data, dtype=float)
+    return sliding_window_view(data, window_length)[:num_windows:step]
+
+
+def lag_covariance(view, chunk_size=2**20):
+    """
+    Lag-covariance matrix S = X X^T of the trajectory matrix X,
+    accumulated over blocks of columns, so only chunk_size elements are copied at a time
+    """
+    L = view.shape[1]
+    rows = max(1, chunk_size // L)
+    S = np.zeros((L, L))
+    for start in range(0, view.shape[0], rows):
+        block = view[start:start + rows]
+        S += block.T @ block
+
+    return S
+
+
+def project_onto(view, U, chunk_size=2**20):
+    """
+    Computes X^T U block by block, returns an array of shape (U.shape[1], n_windows)
+    """
+    L = view.shape[1]
+    rows = max(1, chunk_size // L)
+    P = np.empty((U.shape[1], view.shape[0]))
+    for start in range(0, view.shape[0], rows):
+        P[:, start:start + rows] = (view[start:start + rows] @ U).T
+
+    return P
+
+
+def hankelize(U, sigma, VT):
+    """
+    Diagonal averaging of all elementary matrices sigma_i * u_i v_i^T in one pass.
+
+    The sum along the s-th anti-diagonal of u v^T is the s-th term of the convolution of u and v,
+    so components are obtained with a single FFT convolution per row, 
+    without materializing any L x K matrix.
+    Leading dimensions of U (..., L, r), sigma (..., r) and VT (..., r, K) are batch dimensions.
+
+    Returns
+    -------
+    components : np.ndarray
+        Array of shape (..., L + K - 1, r), one reconstructed component per column
+    """
+    L, K = U.shape[-2], VT.shape[-1]
+    if VT.shape[-2] == 0:
+        return np.zeros(VT.shape[:-2] + (L + K - 1, 0))
+
+    sums = signal.fftconvolve(np.swapaxes(U, -1, -2) * sigma[..., None], VT, axes=-1)
+
+    s = np.arange(L + K - 1)
+    counts = np.minimum.reduce([s + 1, np.full_like(s, min(L, K)), L + K - 1 - s])
+
+    return np.swapaxes(sums / counts, -1, -2)
+
+
+def correlate_columns(x, W):
+    """
+    Valid-mode correlation of the series x with every column of W (by FFT).
+
+    With X the Hankel matrix built from x, correlate_columns(x, V) = X V
+    and correlate_columns(x, U) = X^T U, so products with the trajectory matrix
+    cost O(N log N) per vector instead of O(L * K).
+    """
+    return signal.fftconvolve(x[:, None], W[::-1], mode='valid', axes=0)
+
+
+def trajectory_operator(x, window_length, num_windows, step=1):
+    """
+    Trajectory matrix (L x K) as a LinearOperator, only the columns j % step == 0 are non zero
+    """
+    x = np.asarray(x, dtype=float)[:window_length + num_windows - 1]
+    mask = (np.arange(num_windows) % step == 0)[:, None].astype(float)
+
+    def matmat(V):
+        return correlate_columns(x, mask * V.reshape(num_windows, -1))
+
+    def rmatmat(U):
+        return mask * correlate_columns(x, U.reshape(window_length, -1))
+
+    return LinearOperator((window_length, num_windows), dtype=float,
+                          matvec=lambda v: matmat(v).ravel(), rmatvec=lambda u: rmatmat(u).ravel(),
+                          matmat=matmat, rmatmat=rmatmat)
+
+
+def select_svd_backend(window_length, num_windows, n_keep, oversampling=10, engine='reference'):
+    """
+    Dense SVD if a sizeable part of the spectrum is needed, randomized SVD otherwise.
+    The dense backend of the fast engine is 'eigh' (it never builds the trajectory matrix).
+    """
+    if 4 * (n_keep + oversampling) >= min(window_length, num_windows):
+        return 'eigh' if engine == 'fast' else 'full'
+
+    return 'randomized'
+
+
+def svd_eigh(view, num_windows, step=1, k=None):
+    """
+    SVD of the trajectory matrix from the eigendecomposition of its lag-covariance matrix.
+    Only the first min(k, d) rows of VT are projected (d the numerical rank), all d if k is None,
+    so a truncated decomposition keeps VT at O(k * K) memory.
+    """
+    lam, U = linalg.eigh(lag_covariance(view))
+    lam, U = lam[::-1].clip(min=0), U[:, ::-1]
+
+    sigma = np.sqrt(lam)
+    # rank with the tolerance of np.linalg.matrix_rank, applied to the squared singular values
+    d = int(np.sum(lam > lam[0] * max(view.shape[1], num_windows) * np.finfo(float).eps))
+    r = d if k is None else min(k, d)
+    VT = np.zeros((r, num_windows))
+    VT[:, ::step] = project_onto(view, U[:, :r]) / sigma[:r, None]
+
+    return U, sigma, VT
+
+
+def svd_arpack(operator, k):
+    """
+    Truncated SVD (Lanczos bidiagonalization, ARPACK) of the k largest singular triplets
+    """
+    if k >= min(operator.shape):
+        raise ValueError(f"arpack needs n_keep < {min(operator.shape)}, use 'full' or 'eigh'")
+
+    U, sigma, VT = svds(operator, k=k)
+    order = np.argsort(sigma)[::-1]
+
+    return U[:, order], sigma[order], VT[order]
+
+
+def svd_randomized(operator, k, oversampling=10, n_iter=4, random_state=None):
+    """
+    Randomized SVD of the k largest singular triplets
+
+    References
+    ----------
+    1. Halko, N., Martinsson, P. G., & Tropp, J. A. (2011). Finding structure with randomness: 
+    Probabilistic algorithms for constructing approximate matrix decompositions. SIAM review, 53(2), 217-288.
+    """
+    rng = np.random.default_rng(random_state)
+    L, K = operator.shape
+    l = min(k + oversampling, L, K)
+
+    Q, _ = linalg.qr(operator.matmat(rng.standard_normal((K, l))), mode='economic')
+    for _ in range(n_iter):
+        # power iterations, re-orthonormalized to keep the small singular values
+        Z, _ = linalg.qr(operator.rmatmat(Q), mode='economic')
+        Q, _ = linalg.qr(operator.matmat(Z), mode='economic')
+
+    B = operator.rmatmat(Q).T
+    Ub, sigma, VT = linalg.svd(B, full_matrices=False)
+
+    return (Q @ Ub)[:, :k], sigma[:k], VT[:k]
+
+
+def batched_eigh_components(X, window_length, num_windows, step=1, n_keep=7, max_elements=2**25):
+    """
+    Components of many same-length series, 
+    the lag-covariance eigendecompositions and the diagonal averaging are batched over series.
+    Series are processed in batches of at most max_elements floats of work arrays
+    (L x L lag-covariance matrices, n_keep x K projections and the FFT products),
+    so memory does not grow with the number of series beyond the returned components.
+
+    Returns
+    -------
+    components : np.ndarray
+        Array of shape (n_series, N // step, n_keep), 
+        components beyond the rank of a series are zero
+    """
+    n_series, N = X.shape
+    L, K = window_length, num_windows
+    r = min(n_keep, L)
+    batch_size = max(1, max_elements // (L * L + 3 * r * (L + K)))
+
+    components = np.zeros((n_series, N // step, n_keep))
+    for start in range(0, n_series, batch_size):
+        views = [trajectory_view(x, L, K, step) for x in X[start:start + batch_size]]
+
+        lam, U = np.linalg.eigh(np.stack([lag_covariance(view) for view in views]))
+        lam, U = lam[:, ::-1].clip(min=0), U[:, :, ::-1]
+
+        d = np.sum(lam > lam[:, :1] * max(L, K) * np.finfo(float).eps, axis=1)
+        kept = np.arange(r) < d[:, None]
+
+        U = np.ascontiguousarray(U[:, :, :r])
+        sigma = np.where(kept, np.sqrt(lam[:, :r]), 0)
+        VT = np.zeros((len(views), r, K))
+        VT[:, :, ::step] = np.stack([project_onto(view, u) for view, u in zip(views, U)])
+        VT /= np.where(kept, sigma, 1)[:, :, None]
+
+        components[start:start + len(views), :, :r] = hankelize(U, sigma, VT)[:, :N // step]
+
+    return components
+
+
+def _transform_components(ssa, data):
+    # worker of SSA.transform_many, runs on its own SSA instance
+    ssa.transform(data)
+    components = np.zeros((ssa.data_size // ssa.step, ssa.n_keep))
+    kept = ssa.decomposition[:, :ssa.n_keep]
+    components[:, :kept.shape[1]] = kept
+
+    return components
 
 
 class SSA:
 
-    def __init__(self, window_length, step=1, n_keep=7):
+    def __init__(self, window_length, step=1, n_keep=7, engine='reference', svd=None,
+                 oversampling=10, n_iter=4, random_state=None):
         """
         Singular spectrum analysis, 
         aid in the decomposition of time series into a sum of components.
 
         Uses memory intensive SVD calculations, break large time series in chunks before appling.
-
+        The 'fast' engine avoids this: trajectory matrix is a strided view over the data,
+        the SVD is taken from the eigendecomposition of the L x L lag-covariance matrix
+        and only the n_keep components are diagonally averaged (by FFT convolution),
+        memory is O(L^2 + L * n_keep + N).
+        Series larger than memory can be processed with transform_stream,
+        which reconstructs overlapping chunks and cross-fades them at the overlaps.
 
         Parameters
         ----------
@@ -21,6 +260,25 @@ class SSA:
             [b]
         n_keep: Int, default=7
             [c]
+        engine: Str, default='reference'
+            'reference' - full SVD and explicit elementary matrices,
+            'fast' - strided trajectory view and FFT diagonal averaging,
+            decomposition then holds only the first min(n_keep, d) components
+        svd: Str, optional
+            SVD backend, one of:
+            'full' - LAPACK SVD of the dense trajectory matrix (default of the reference engine),
+            'eigh' - eigendecomposition of the lag-covariance matrix (default of the fast engine),
+            'arpack' - truncated Lanczos SVD of the n_keep largest triplets,
+            'randomized' - randomized SVD with oversampling and power iterations,
+            'auto' - chosen from window_length, K and n_keep (see select_svd_backend).
+            The truncated backends only compute n_keep components,
+            the relative error of the rank n_keep approximation is stored in approximation_error
+        oversampling: Int, default=10
+            Extra random vectors of the randomized SVD
+        n_iter: Int, default=4
+            Power iterations of the randomized SVD
+        random_state: Int or np.random.Generator, optional
+            Seed of the randomized SVD
 
         Example
         ----------
@@ -32,9 +290,19 @@ class SSA:
         2. https://www.wikiwand.com/en/Singular_spectrum_analysis.
 
         """
+        if engine not in ('reference', 'fast'):
+            raise ValueError(f"Unknown engine: {engine}")
+        if svd is not None and svd not in SVD_BACKENDS:
+            raise ValueError(f"Unknown svd backend: {svd}")
+
         self.window_length = window_length
         self.step = step
         self.n_keep = n_keep
+        self.engine = engine
+        self.svd = svd
+        self.oversampling = oversampling
+        self.n_iter = n_iter
+        self.random_state = random_state
 
     def transform(self, data):
         self.data_size = len(data)
@@ -42,6 +310,19 @@ class SSA:
             (self.data_size - self.window_length + 1) / self.step)
 
         self.data = data
+
+        if self.engine == 'fast':
+            # components of the trajectory matrix without materializing it,
+            # numerically the same as the first n_keep columns of the reference decomposition
+            self.trajectory_matrix = trajectory_view(
+                self.data, self.window_length, self.num_windows, self.step)
+            self.decompose_trajectory_matrix()
+            r = min(self.n_keep, self.d)
+            components = hankelize(self.U[:, :r], self.sigma[:r], self.VT[:r])
+            self.decomposition = components[:self.data_size // self.step]
+
+            return self.reconstruct()
+
         self.get_trajectory_matrix()
         self.decompose_trajectory_matrix()
         self.build_elementary_matrices()
@@ -51,6 +332,132 @@ class SSA:
 
         return reconstructed_signal
 
+    def transform_many(self, X, n_workers=None, executor='thread'):
+        """
+        Decompose many same-length series at once, without changing the state of this instance
+        (safe to call concurrently).
+
+        With the fast engine and the 'eigh' backend the SVDs and the diagonal averaging 
+        are batched over series, otherwise every series is decomposed 
+        by a copy of this SSA in a thread or process pool.
+
+        Parameters
+        ----------
+        X : array_like
+            Array of shape (n_series, N)
+        n_workers: Int, optional
+            Size of the pool (default of concurrent.futures), 1 runs in the calling thread
+        executor: Str, default='thread'
+            'thread' or 'process'
+
+        Returns
+        -------
+        components : np.ndarray
+            Array of shape (n_series, N // step, n_keep), 
+            components.sum(axis=2) are the reconstructed signals
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        num_windows = int((X.shape[1] - self.window_length + 1) / self.step)
+
+        backend = self.svd or ('eigh' if self.engine == 'fast' else 'full')
+        if backend == 'auto':
+            backend = select_svd_backend(
+                self.window_length, num_windows, self.n_keep, self.oversampling, self.engine)
+        if self.engine == 'fast' and backend == 'eigh':
+            return batched_eigh_components(X, self.window_length, num_windows, self.step, self.n_keep)
+
+        params = dict(window_length=self.window_length, step=self.step, n_keep=self.n_keep,
+                      engine=self.engine, svd=backend, oversampling=self.oversampling,
+                      n_iter=self.n_iter, random_state=self.random_state)
+        copies = [SSA(**params) for _ in range(len(X))]
+        if n_workers == 1:
+            return np.stack([_transform_components(ssa, x) for ssa, x in zip(copies, X)])
+
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor: {executor}")
+        pool = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+        with pool(max_workers=n_workers) as ex:
+            return np.stack(list(ex.map(_transform_components, copies, X)))
+
+    def transform_stream(self, chunks, chunk_size=2**16, overlap=None):
+        """
+        Reconstruct a long series chunk by chunk, 
+        peak memory is O(L^2 + L * n_keep + chunk_size) instead of growing with the length of the series.
+
+        Chunks are always decomposed by the fast engine, which gives the same components
+        without the d dense L x chunk_size elementary matrices of the reference engine;
+        with engine='reference' a fast copy of this SSA does the work.
+        Consecutive chunks share overlap samples, 
+        the reconstructions are linearly cross-faded on the overlap to avoid seams
+        (edge effects of SSA reach about window_length samples into a chunk).
+        Attributes (U, sigma, decomposition...) of the fast engine describe the last processed chunk.
+
+        Parameters
+        ----------
+        chunks : Str, array_like or Iterable[array_like]
+            Path to a .npy file (memory-mapped), an array (np.memmap included) 
+            or any iterable of 1-D arrays of arbitrary lengths
+        chunk_size: Int, default=2**16
+            Number of samples decomposed at once
+        overlap: Int, default=2*window_length
+            Number of samples shared by consecutive chunks
+
+        Yields
+        ------
+        segment : np.ndarray
+            Consecutive parts of the reconstructed signal, 
+            their concatenation has the length of the whole series
+        """
+        if self.step != 1:
+            raise ValueError("transform_stream supports step=1 only")
+
+        overlap = 2 * self.window_length if overlap is None else overlap
+        if not self.window_length <= overlap < chunk_size:
+            raise ValueError("Expected window_length <= overlap < chunk_size")
+
+        if isinstance(chunks, str):
+            chunks = np.load(chunks, mmap_mode='r')
+        if isinstance(chunks, np.ndarray):
+            chunks = [chunks]
+
+        ssa = self
+        if self.engine != 'fast':
+            ssa = SSA(self.window_length, step=self.step, n_keep=self.n_keep, engine='fast', svd=self.svd,
+                      oversampling=self.oversampling, n_iter=self.n_iter, random_state=self.random_state)
+
+        ramp = np.linspace(0, 1, overlap + 2)[1:-1]
+        buffer = np.empty(0)
+        previous_tail = None
+
+        def blend(reconstruction):
+            if previous_tail is not None:
+                reconstruction[:overlap] = (1 - ramp) * previous_tail + ramp * reconstruction[:overlap]
+            return reconstruction
+
+        for chunk in chunks:
+            chunk = np.ravel(chunk)
+            start = 0
+            while start < len(chunk):
+                # slicing a memmap only reads the needed samples
+                need = chunk_size - len(buffer)
+                buffer = np.concatenate([buffer, chunk[start:start + need]])
+                start += need
+
+                if len(buffer) == chunk_size:
+                    reconstruction = blend(np.asarray(ssa.transform(buffer)))
+                    yield reconstruction[:-overlap]
+
+                    previous_tail = reconstruction[-overlap:]
+                    buffer = buffer[-overlap:]
+
+        if previous_tail is None:
+            if len(buffer):
+                yield np.asarray(ssa.transform(buffer))
+        elif len(buffer) > overlap:
+            yield blend(np.asarray(ssa.transform(buffer)))
+        else:
+            yield previous_tail
+
     def get_trajectory_matrix(self):
         self.trajectory_matrix = np.zeros(
             (self.window_length, self.num_windows))
@@ -58,8 +465,44 @@ class SSA:
             self.trajectory_matrix[:, j] = self.data[j: j + self.window_length]
 
     def decompose_trajectory_matrix(self):
-        self.U, self.sigma, self.VT = linalg.svd(self.trajectory_matrix)
-        self.d = np.linalg.matrix_rank(self.trajectory_matrix)
+        L, K = self.window_length, self.num_windows
+        backend = self.svd or ('eigh' if self.engine == 'fast' else 'full')
+        if backend == 'auto':
+            backend = select_svd_backend(L, K, self.n_keep, self.oversampling, self.engine)
+        self.svd_backend = backend
+
+        if backend == 'full':
+            X = self.trajectory_matrix
+            if self.engine == 'fast':
+                X = np.zeros((L, K))
+                X[:, ::self.step] = self.trajectory_matrix.T
+            self.U, self.sigma, self.VT = linalg.svd(X, full_matrices=False)
+        elif backend == 'eigh':
+            view = trajectory_view(self.data, L, K, self.step)
+            # the reference engine builds all d elementary matrices
+            k = None if self.engine == 'reference' else self.n_keep
+            self.U, self.sigma, self.VT = svd_eigh(view, K, self.step, k)
+        else:
+            operator = trajectory_operator(self.data, L, K, self.step)
+            if backend == 'arpack':
+                self.U, self.sigma, self.VT = svd_arpack(operator, self.n_keep)
+            else:
+                self.U, self.sigma, self.VT = svd_randomized(
+                    operator, self.n_keep, self.oversampling, self.n_iter, self.random_state)
+
+        # rank with the tolerance of np.linalg.matrix_rank, without a second SVD
+        # (for 'eigh' it is applied to the squared singular values)
+        tol = max(L, K) * np.finfo(float).eps
+        if backend == 'eigh':
+            self.d = int(np.sum(self.sigma**2 > self.sigma[0]**2 * tol))
+        else:
+            self.d = int(np.sum(self.sigma > self.sigma[0] * tol))
+
+        # relative Frobenius error of the rank n_keep approximation: ||X - X_r|| / ||X||
+        cs = np.concatenate([[0], np.cumsum(np.asarray(self.data[:L + K - 1], dtype=float)**2)])
+        norm2 = np.sum(cs[L:L + K:self.step] - cs[:K:self.step])
+        kept2 = np.sum(self.sigma[:min(self.n_keep, self.d)]**2)
+        self.approximation_error = np.sqrt(max(norm2 - kept2, 0) / norm2) if norm2 else 0.0
 
     def build_elementary_matrices(self):
         # Construct and save all the elementary matrices
@@ -86,3 +529,150 @@ class SSA:
 
         reconstructed_signal = self.decomposition[:, :self.n_keep].sum(axis=1).squeeze().tolist()
         return reconstructed_signal
+
+
+class OnlineSSA:
+
+    def __init__(self, window_length, n_keep=7, forgetting=1.0, warmup=None, refresh=None):
+        """
+        Online singular spectrum analysis for live denoising.
+
+        The signal subspace (n_keep leading left singular vectors of the trajectory matrix) 
+        is fitted once by batch SSA on the first warmup samples 
+        and then tracked with the PAST recursion, O(L * n_keep) per sample:
+
+            y = W^T x,  h = P y,  g = h / (beta + y^T h)
+            P = (P - g h^T) / beta,  W = W + (x - W y) g^T
+
+        where x is the newest lagged vector, W (L x n_keep) the tracked basis, 
+        P the inverse of the projected lag-covariance matrix. 
+        W is re-orthonormalized every refresh samples, O(L * n_keep^2) amortized to O(n_keep^2).
+
+        The value returned for a new sample is the last element of the projection W W^T x, 
+        while batch SSA.transform returns the last element of U U^T x for the last sample of a series 
+        (the last anti-diagonal of the trajectory matrix holds one element), U the batch basis. Hence:
+
+            |online - batch| <= ||W W^T - U U^T||_2 * ||x||
+
+        and with W orthonormal (after every re-orthonormalization, always with refresh=1)
+        ||W W^T - U U^T||_2 = ||sin(theta)||, theta the principal angles between span(W) and span(U). 
+        With forgetting=1 the recursion minimizes the same least-squares criterion as the batch SVD 
+        and ||sin(theta)|| decays as the number of samples grows, 
+        provided the spectrum has a gap after the n_keep-th singular value; 
+        forgetting < 1 trades that accuracy for tracking of non-stationary signals.
+
+        Parameters
+        ----------
+        window_length: Int
+            L, length of the lagged vectors
+        n_keep: Int, default=7
+            Number of components kept
+        forgetting: Float, default=1.0
+            beta in (0, 1], weight of past lagged vectors
+        warmup: Int, default=2*window_length
+            Number of samples fitted by batch SSA before tracking starts
+        refresh: Int, default=window_length
+            Re-orthonormalize the tracked basis every refresh samples
+
+        Example
+        ----------
+        >>> ossa = OnlineSSA(50, n_keep=4)
+        >>> ossa.fit(history)
+        >>> for samples in telemetry:
+        ...     denoised = ossa.update(samples)
+
+        References
+        ----------
+        1. Yang, B. (1995). Projection approximation subspace tracking. 
+        IEEE Transactions on Signal processing, 43(1), 95-107.
+        """
+        self.window_length = window_length
+        self.n_keep = n_keep
+        self.forgetting = forgetting
+        self.warmup = 2 * window_length if warmup is None else warmup
+        self.refresh = window_length if refresh is None else refresh
+
+        if self.warmup < window_length + n_keep:
+            raise ValueError("warmup should be at least window_length + n_keep")
+
+        self.W = None
+        self._pending = []
+
+    def fit(self, data):
+        """
+        Initialize the tracked subspace by batch SSA (fast engine) on data
+
+        Returns
+        -------
+        reconstructed_signal : np.ndarray
+            Batch reconstruction of data
+        """
+        ssa = SSA(self.window_length, n_keep=self.n_keep, engine='fast')
+        reconstructed_signal = np.asarray(ssa.transform(data))
+
+        r = min(self.n_keep, ssa.d)
+        self.W = ssa.U[:, :r].copy()
+        # P = (sum_j y_j y_j^T)^-1 = Sigma^-2 for y_j = U^T x_j
+        self.P = np.diag(1 / ssa.sigma[:r]**2)
+        self.lagged = np.asarray(data[-self.window_length:], dtype=float).copy()
+        self._since_refresh = 0
+        self._pending = []
+
+        return reconstructed_signal
+
+    def _orthonormalize(self):
+        # W = QR, y' = R y, P' = R^-T P R^-1
+        Q, R = linalg.qr(self.W, mode='economic')
+        Rinv = linalg.solve_triangular(R, np.eye(R.shape[0]))
+        self.W, self.P = Q, Rinv.T @ self.P @ Rinv
+        self._since_refresh = 0
+
+    def update(self, new_samples):
+        """
+        Push new samples and return their reconstruction
+
+        Parameters
+        ----------
+        new_samples : array_like
+            New samples of the series (a scalar is accepted)
+
+        Returns
+        -------
+        reconstructed : np.ndarray
+            One value per new sample. 
+            Samples received before the warm-up is complete are NaN, 
+            except for those of the call that completes it (batch values)
+        """
+        new_samples = np.atleast_1d(np.asarray(new_samples, dtype=float))
+        reconstructed = np.full(len(new_samples), np.nan)
+
+        start = 0
+        if self.W is None:
+            missing = self.warmup - len(self._pending)
+            self._pending.extend(new_samples[:missing])
+            start = min(missing, len(new_samples))
+            if len(self._pending) < self.warmup:
+                return reconstructed
+
+            batch = self.fit(np.asarray(self._pending))
+            reconstructed[:start] = batch[len(batch) - start:]
+
+        beta = self.forgetting
+        for i in range(start, len(new_samples)):
+            self.lagged = np.roll(self.lagged, -1)
+            self.lagged[-1] = x_last = new_samples[i]
+            x = self.lagged
+
+            y = self.W.T @ x
+            h = self.P @ y
+            g = h / (beta + y @ h)
+            self.P = (self.P - np.outer(g, h)) / beta
+            self.W += np.outer(x - self.W @ y, g)
+
+            self._since_refresh += 1
+            if self._since_refresh >= self.refresh:
+                self._orthonormalize()
+
+            reconstructed[i] = self.W[-1] @ (self.W.T @ x)
+
+        return reconstructed
@@ -0,0 +1,69 @@
+import numpy as np
+from scipy import linalg
+
+from ssa import SSA, OnlineSSA
+
+
+def _series(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    return 0.01 * t + np.sin(2 * np.pi * t / 37) + 0.5 * np.sin(2 * np.pi * t / 11) + 0.3 * rng.standard_normal(n)
+
+
+def test_fast_engine_matches_reference():
+    x = _series()
+    for step in (1, 3):
+        for n_keep in (1, 3, 7):
+            reference, fast = SSA(40, step, n_keep), SSA(40, step, n_keep, engine='fast')
+            np.testing.assert_allclose(fast.transform(x), reference.transform(x), atol=1e-10)
+            r = fast.decomposition.shape[1]
+            np.testing.assert_allclose(fast.decomposition, reference.decomposition[:, :r], atol=1e-10)
+
+
+def test_transform_many_matches_transform():
+    X = np.stack([_series(seed=seed) for seed in range(4)])
+    for engine in ('reference', 'fast'):
+        for step in (1, 3):
+            ssa = SSA(40, step, 5, engine=engine)
+            components = ssa.transform_many(X, n_workers=1)
+            for x, c in zip(X, components):
+                single = SSA(40, step, 5, engine=engine)
+                np.testing.assert_allclose(c.sum(axis=1), single.transform(x), atol=1e-10)
+                np.testing.assert_allclose(c, single.decomposition[:, :5], atol=1e-10)
+
+
+def _online_vs_batch(noise, n_keep, refresh=None, n=500, window_length=30, warmup=60, seed=0):
+    # online value of every sample after the warm-up, the batch value transform(x[:t])[-1],
+    # the batch basis U and the tracked basis W at that sample
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    x = np.sin(2 * np.pi * t / 37) + noise * rng.standard_normal(n)
+
+    ossa = OnlineSSA(window_length, n_keep=n_keep, warmup=warmup, refresh=refresh)
+    ossa.fit(x[:warmup])
+    for i in range(warmup, n):
+        online = ossa.update(x[i])[0]
+        ssa = SSA(window_length, n_keep=n_keep, engine='fast')
+        batch = ssa.transform(x[:i + 1])[-1]
+        yield online, batch, ssa.U[:, :n_keep], ossa.W.copy(), x[i + 1 - window_length:i + 1]
+
+
+def test_online_within_documented_bound():
+    # no spectral gap after n_keep: large differences, still within the bound
+    for online, batch, U, W, x in _online_vs_batch(noise=0.3, n_keep=3):
+        bound = np.linalg.norm(W @ W.T - U @ U.T, 2) * np.linalg.norm(x)
+        assert abs(online - batch) <= bound + 1e-9
+
+
+def test_online_bound_by_principal_angles():
+    # with refresh=1 W is orthonormal and the bound is ||sin(theta)|| * ||x||
+    for online, batch, U, W, x in _online_vs_batch(noise=0.3, n_keep=3, refresh=1):
+        np.testing.assert_allclose(W.T @ W, np.eye(W.shape[1]), atol=1e-10)
+        sin_theta = np.sin(linalg.subspace_angles(W, U).max())
+        assert abs(online - batch) <= sin_theta * np.linalg.norm(x) + 1e-9
+
+
+def test_online_converges_to_batch_with_spectral_gap():
+    errors = np.array([abs(online - batch) for online, batch, *_ in _online_vs_batch(noise=0.3, n_keep=2)])
+    assert errors.max() < 0.05
+    assert errors[-100:].max() < 1e-2